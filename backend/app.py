@@ -1,5 +1,7 @@
+import asyncio
+import logging
 from fastapi import FastAPI
-from database import create_db_and_tables
+from database import create_db_and_tables, describe_engine
 from routes.auth import auth_router, users_router
 from contextlib import asynccontextmanager
 from models.user import UserCreate
@@ -7,12 +9,24 @@ from auth.users import get_user_manager, get_user_db
 from fastapi_users.exceptions import UserAlreadyExists
 from database import get_async_session
 from fastapi.middleware.cors import CORSMiddleware
-from routes import grievances
+from routes import grievances, metrics
+from core.log import RequestContextMiddleware, configure_logging, shutdown_logging
+from core.cache import run_cache_listener
+from core.events import event_hub
+from core.hashing import password_hasher
+from core.metrics import MetricsMiddleware, run_snapshot_writer
+from core.outbox import run_outbox_worker
+from core.querystats import QueryStatsMiddleware
+
+configure_logging()
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    configure_logging()  # No-op unless a previous shutdown stopped the writer
     await create_db_and_tables()
+    logger.info("Database engine ready", extra={"engine": await describe_engine()})
 
     # Create admin user if it doesn't exist
     try:
@@ -38,19 +52,34 @@ async def lifespan(app: FastAPI):
             ),
             is_system_init=True,
         )
-        print("Admin user created successfully")
+        logger.info("Admin user created successfully")
     except UserAlreadyExists:
-        print("Admin user already exists")
-    except Exception as e:
-        print(f"Error creating admin user: {e}")
+        logger.info("Admin user already exists")
+    except Exception:
+        logger.exception("Error creating admin user")
     finally:
         await session.close()
 
+    snapshot_writer = asyncio.create_task(run_snapshot_writer())
+    cache_listener = asyncio.create_task(run_cache_listener())
+    outbox_drainer = asyncio.create_task(run_outbox_worker())
+
     yield
 
+    snapshot_writer.cancel()
+    cache_listener.cancel()
+    outbox_drainer.cancel()
+    event_hub.close()
+    password_hasher.shutdown()
+    shutdown_logging()
+
 
 app = FastAPI(lifespan=lifespan)
 
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware, routes_app=app)
+app.add_middleware(RequestContextMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -69,3 +98,4 @@ app.add_middleware(
 app.include_router(auth_router, prefix="/auth")
 app.include_router(users_router, prefix="/users")
 app.include_router(grievances.router)
+app.include_router(metrics.router)
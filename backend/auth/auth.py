@@ -1,19 +1,131 @@
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import jwt
+from fastapi import HTTPException, status
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
+from fastapi_users.jwt import decode_jwt, generate_jwt
+from sqlalchemy import select
+from database import async_session_maker
+from models.user import User, UserRole
+
+SECRET = "YOUR-SECRET-KEY"
+TOKEN_LIFETIME_SECONDS = 3600
+
+# "database" loads the User row on every request (fastapi-users default).
+# "claims" signs id, role, unit and active flag into the token so read-only
+# routes can authorize from the token alone.
+AUTH_MODE = os.getenv("AUTH_MODE", "database")
+# Upper bound, in seconds, on how long a worker may keep honoring a token
+# after the user's role, unit or active flag changed.
+CLAIMS_MAX_STALENESS = int(os.getenv("AUTH_CLAIMS_MAX_STALENESS", "30"))
+# Users whose token generation a worker remembers; the least recently seen
+# are dropped beyond this and simply re-read on their next request
+CLAIMS_CACHE_ENTRIES = int(os.getenv("AUTH_CLAIMS_CACHE_ENTRIES", "10000"))
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
+@dataclass(frozen=True)
+class TokenUser:
+    """The subset of User that read-only routes need, rebuilt from token claims."""
+    id: uuid.UUID
+    role: UserRole
+    unit: Optional[str]
+    is_active: bool
+
+class TokenGenerations:
+    """Per-worker cache of each user's token generation.
+
+    update_user bumps User.token_generation whenever role, unit or active state
+    changes, which invalidates every token carrying the old value. Entries are
+    re-read from the database once they are older than CLAIMS_MAX_STALENESS, so
+    a change made through another worker is picked up within that window while
+    the common case costs no query at all. At most `max_entries` users are
+    kept, least recently seen dropped first.
+    """
+
+    def __init__(self, max_staleness: int, max_entries: int = CLAIMS_CACHE_ENTRIES):
+        self.max_staleness = max_staleness
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[uuid.UUID, Tuple[Optional[int], float]]" = OrderedDict()
+
+    async def get(self, user_id: uuid.UUID) -> Optional[int]:
+        entry = self._entries.get(user_id)
+        if entry and time.monotonic() - entry[1] < self.max_staleness:
+            self._entries.move_to_end(user_id)
+            return entry[0]
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(User.token_generation).where(User.id == user_id)
+            )
+            generation = result.scalar_one_or_none()
+        self.set(user_id, generation)
+        return generation
+
+    def set(self, user_id: uuid.UUID, generation: Optional[int]) -> None:
+        self._entries[user_id] = (generation, time.monotonic())
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+token_generations = TokenGenerations(CLAIMS_MAX_STALENESS)
+
+class ClaimsJWTStrategy(JWTStrategy):
+    """JWTStrategy whose tokens also carry the claims TokenUser is built from.
+
+    Tokens stay valid for the regular database-backed read_token, so routes
+    that still depend on current_user accept them unchanged.
+    """
+
+    async def write_token(self, user: User) -> str:
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "role": user.role.value,
+            "unit": user.unit,
+            "active": user.is_active,
+            "gen": user.token_generation or 0,
+        }
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    async def read_claims(self, token: Optional[str]) -> TokenUser:
+        unauthorized = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+        if token is None:
+            raise unauthorized
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user = TokenUser(
+                id=uuid.UUID(data["sub"]),
+                role=UserRole(data["role"]),
+                unit=data["unit"],
+                is_active=data["active"],
+            )
+            generation = data["gen"]
+        except (jwt.PyJWTError, KeyError, ValueError):
+            raise unauthorized
+
+        # A missing user (deleted) or a bumped generation revokes the token
+        if not user.is_active or await token_generations.get(user.id) != generation:
+            raise unauthorized
+        return user
+
 def get_jwt_strategy() -> JWTStrategy:
+    if AUTH_MODE == "claims":
+        return ClaimsJWTStrategy(secret=SECRET, lifetime_seconds=TOKEN_LIFETIME_SECONDS)
     return JWTStrategy(
-        secret="YOUR-SECRET-KEY",
-        lifetime_seconds=3600,
+        secret=SECRET,
+        lifetime_seconds=TOKEN_LIFETIME_SECONDS,
     )
 
 auth_backend = AuthenticationBackend(
     name="jwt",
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
-) 
\ No newline at end of file
+)
@@ -1,10 +1,18 @@
-from typing import Optional, Union
+import logging
+from typing import Any, Dict, Optional, Union
 from fastapi import Request, HTTPException
-from fastapi_users import BaseUserManager, UUIDIDMixin
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, UUIDIDMixin, exceptions
 import uuid
 from models.user import User, UserCreate
+from core.hashing import password_hasher
+from core.metrics import LOGINS
+
+logger = logging.getLogger(__name__)
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
+    # create, authenticate and _update follow BaseUserManager but hash on
+    # password_hasher's worker threads instead of blocking the event loop
     reset_password_token_secret = "SECRET-RESET-TOKEN"
     verification_token_secret = "SECRET-VERIFY-TOKEN"
 
@@ -44,7 +52,56 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
                         detail="Only supervisors and admins can create supervisor accounts"
                     )
 
-        return await super().create(user_create, safe, request)
+        await self.validate_password(user_create.password, user_create)
+        if await self.user_db.get_by_email(user_create.email) is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        await self._release_connection()
+        user_dict["hashed_password"] = await password_hasher.hash(user_dict.pop("password"))
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        user = await self._verify_credentials(credentials)
+        LOGINS.inc("success" if user is not None and user.is_active else "failure")
+        return user
+
+    async def _verify_credentials(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            user = None
+        await self._release_connection()
+        if user is None:
+            # Hash anyway so unknown emails take as long as wrong passwords
+            await password_hasher.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_hasher.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def _release_connection(self) -> None:
+        # End the read transaction so the pooled connection is not held while
+        # waiting for a hashing worker; during a login flood those waits would
+        # otherwise tie up every connection and stall unrelated requests.
+        # Sessions do not expire on commit, so loaded users stay usable.
+        await self.user_db.session.commit()
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {field: value for field, value in update_dict.items() if field != "password"}
+            update_dict["hashed_password"] = await password_hasher.hash(password)
+        return await super()._update(user, update_dict)
 
     async def on_after_register(self, user: User, request: Optional[Request] = None):
-        print(f"User {user.id} has registered with role {user.role}") 
\ No newline at end of file
+        logger.info("User %s has registered with role %s", user.id, user.role.value) 
\ No newline at end of file
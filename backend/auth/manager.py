@@ -1,3 +1,4 @@
+import logging
 from typing import Optional, Union
 from fastapi import Depends, Request, HTTPException
 from fastapi_users import BaseUserManager, UUIDIDMixin
@@ -5,6 +6,8 @@ import uuid
 from models.user import User, UserCreate
 from auth.users import current_user
 
+logger = logging.getLogger(__name__)
+
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = "SECRET-RESET-TOKEN"
     verification_token_secret = "SECRET-VERIFY-TOKEN"
@@ -44,4 +47,4 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         return await super().create(user_create, safe, request)
 
     async def on_after_register(self, user: User, request: Optional[Request] = None):
-        print(f"User {user.id} has registered with role {user.role}") 
\ No newline at end of file
+        logger.info("User %s has registered with role %s", user.id, user.role.value) 
\ No newline at end of file
@@ -4,7 +4,7 @@ from fastapi_users.db import SQLAlchemyUserDatabase
 from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 from models.user import User
-from auth.auth import auth_backend
+from auth.auth import AUTH_MODE, ClaimsJWTStrategy, auth_backend, bearer_transport, get_jwt_strategy
 from auth.base import UserManager
 from database import get_async_session
 
@@ -19,4 +19,16 @@ fastapi_users = FastAPIUsers[User, uuid.UUID](
     [auth_backend],
 )
 
-current_user = fastapi_users.current_user() 
\ No newline at end of file
+current_user = fastapi_users.current_user()
+
+async def current_token_user(token: str = Depends(bearer_transport.scheme)):
+    strategy = get_jwt_strategy()
+    if not isinstance(strategy, ClaimsJWTStrategy):
+        # Only wired in as current_reader under AUTH_MODE=claims; anywhere
+        # else it would accept tokens that carry no claims to check
+        raise RuntimeError("current_token_user requires AUTH_MODE=claims")
+    return await strategy.read_claims(token)
+
+# Dependency for read-only routes: in claims mode it authorizes from the token
+# without loading the User row; otherwise it is the regular current_user.
+current_reader = current_token_user if AUTH_MODE == "claims" else current_user
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Set
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from core.etag import etag_matches, not_modified, set_etag
+from core.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# "local" caches per worker; "broker" also shares invalidations between
+# workers on this host; "off" disables caching
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_BROKER_PATH = os.getenv("CACHE_BROKER_PATH", os.path.join(tempfile.gettempdir(), "grievance-cache-invalidations.log"))
+CACHE_BROKER_POLL_SECONDS = float(os.getenv("CACHE_BROKER_POLL_SECONDS", "0.1"))
+# The broker log is truncated once it grows past this
+CACHE_BROKER_MAX_BYTES = int(os.getenv("CACHE_BROKER_MAX_BYTES", str(1024 * 1024)))
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    tags: frozenset
+    expires_at: float
+    meta: dict = field(default_factory=dict)  # Whatever the route needs to check access on a hit
+
+class ResponseCache:
+    """Bounded LRU of serialized responses with a TTL and tag-based invalidation.
+
+    Every entry carries tags naming the data it was built from; a write
+    invalidates the tags it touched. `generation` moves on every
+    invalidation, and `set` refuses entries whose reads began before the
+    latest one, so a slow read racing a write can never cache stale data.
+    """
+
+    def __init__(self, name: str, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.generation = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key, "expired")
+            entry = None
+        if entry is None:
+            CACHE_REQUESTS.inc(self.name, "miss")
+            return None
+        self._entries.move_to_end(key)
+        CACHE_REQUESTS.inc(self.name, "hit")
+        return entry
+
+    def set(self, key: str, body: bytes, etag: str, tags: Iterable[str], generation: int, meta: Optional[dict] = None) -> CacheEntry:
+        """Store a response read at `generation`; returns the entry either way."""
+        entry = CacheEntry(body, etag, frozenset(tags), time.monotonic() + self.ttl, meta or {})
+        if self.max_entries <= 0 or generation != self.generation:
+            return entry
+        if key in self._entries:
+            self._remove(key, None)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)), "lru")
+        CACHE_ENTRIES.set(self.name, value=len(self._entries))
+        return entry
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        self._invalidate_local(set(tags))
+
+    def clear(self) -> None:
+        self.generation += 1
+        for key in list(self._entries):
+            self._remove(key, "invalidated")
+
+    def _invalidate_local(self, tags: Set[str]) -> None:
+        self.generation += 1
+        for tag in tags:
+            for key in list(self._keys_by_tag.get(tag, ())):
+                self._remove(key, "invalidated")
+
+    def _remove(self, key: str, reason: Optional[str]) -> None:
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+        if reason:
+            CACHE_EVICTIONS.inc(self.name, reason)
+        CACHE_ENTRIES.set(self.name, value=len(self._entries))
+
+class FileBroker:
+    """Stand-in for a message broker: an append-only file that every worker tails.
+
+    Good enough for several uvicorn workers on one host. Messages from other
+    workers are picked up within CACHE_BROKER_POLL_SECONDS. When the file is
+    truncated, readers cannot know what they missed and must drop everything.
+    """
+
+    def __init__(self, path: str = CACHE_BROKER_PATH):
+        self.path = path
+
+    def publish(self, tags: Set[str]) -> None:
+        line = json.dumps({"pid": os.getpid(), "tags": sorted(tags)}) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size > CACHE_BROKER_MAX_BYTES:
+                os.ftruncate(fd, 0)
+            # A single O_APPEND write is not interleaved with other writers'
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+    async def listen(self, on_tags, on_reset) -> None:
+        offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        while True:
+            await asyncio.sleep(CACHE_BROKER_POLL_SECONDS)
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                continue
+            if size < offset:
+                on_reset()
+                offset = 0
+            if size == offset:
+                continue
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read(size - offset)
+            # Only consume complete lines; a partial one is read next time
+            complete = data.rfind(b"\n") + 1
+            offset += complete
+            for line in data[:complete].splitlines():
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get("pid") != os.getpid():
+                    on_tags(set(message["tags"]))
+
+class BrokeredResponseCache(ResponseCache):
+    """ResponseCache that publishes its invalidations and applies everyone else's."""
+
+    def __init__(self, name: str, broker: FileBroker, **kwargs):
+        super().__init__(name, **kwargs)
+        self.broker = broker
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        self._invalidate_local(tags)
+        try:
+            self.broker.publish(tags)
+        except OSError:
+            # Other workers will serve stale entries for up to the TTL
+            logger.exception("Could not publish cache invalidation")
+
+    async def listen(self) -> None:
+        await self.broker.listen(self._invalidate_local, self.clear)
+
+def build_cache(name: str) -> ResponseCache:
+    if CACHE_BACKEND == "off":
+        return ResponseCache(name, max_entries=0)
+    if CACHE_BACKEND == "broker":
+        return BrokeredResponseCache(name, FileBroker())
+    return ResponseCache(name)
+
+# Grievance list and detail responses
+response_cache = build_cache("grievances")
+
+async def run_cache_listener() -> None:
+    """Background task applying other workers' invalidations (broker backend only)."""
+    if isinstance(response_cache, BrokeredResponseCache):
+        await response_cache.listen()
+
+def cache_key(route: str, scope: str, request: Request) -> str:
+    params = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{route}|{scope}|{params}"
+
+def serialize(content) -> bytes:
+    # Same encoding FastAPI's JSONResponse produces
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def cached_response(entry: CacheEntry, request: Request) -> Response:
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return not_modified(entry.etag)
+    response = Response(content=entry.body, media_type="application/json")
+    set_etag(response, entry.etag)
+    return response
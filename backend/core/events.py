@@ -0,0 +1,165 @@
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Iterable, List, Optional, Set, Tuple
+from fastapi.encoders import jsonable_encoder
+from core.metrics import EVENT_SUBSCRIBERS, EVENT_SUBSCRIBERS_DROPPED, EVENTS_PUBLISHED
+
+# Events kept for Last-Event-ID resume; a client further behind than this
+# is told to reload instead
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "1000"))
+# Events buffered per subscriber; one that falls this far behind is dropped
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Idle streams get a comment line this often so proxies keep them open
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Reconnect delay suggested to EventSource clients
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", "3000"))
+
+@dataclass
+class GrievanceEvent:
+    id: str
+    type: str  # grievance.created, grievance.updated, grievance.deleted or note.created
+    grievance_id: uuid.UUID
+    owner_id: uuid.UUID
+    units: Tuple[str, ...]  # Every unit whose supervisors may see it (old and new on a move)
+    data: dict
+
+    def encode(self) -> bytes:
+        payload = json.dumps(jsonable_encoder(self.data), separators=(",", ":"))
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n".encode()
+
+# A subscriber's visibility check: (owner id, unit) -> may see it
+Visibility = Callable[[uuid.UUID, str], bool]
+
+@dataclass(eq=False)
+class Subscription:
+    visible: Visibility
+    queue: "asyncio.Queue[Optional[GrievanceEvent]]" = field(default_factory=lambda: asyncio.Queue(EVENTS_QUEUE_SIZE))
+
+    def wants(self, event: GrievanceEvent) -> bool:
+        return any(self.visible(event.owner_id, unit) for unit in event.units)
+
+class EventHub:
+    """In-process pub/sub for grievance changes, fanned out to SSE streams.
+
+    Routes publish after their transaction commits. Event ids are
+    "<epoch>:<sequence>", where the epoch changes whenever the process
+    restarts, so a Last-Event-ID from before a restart (or from another
+    worker) is recognised as unresumable. Each worker only sees the writes
+    it handled itself; with several workers a client may miss events until
+    its next reload.
+    """
+
+    def __init__(self, replay_size: int = EVENTS_REPLAY_SIZE):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.sequence = 0
+        self.replay: Deque[GrievanceEvent] = deque(maxlen=replay_size)
+        self.subscribers: Set[Subscription] = set()
+
+    def publish(self, type: str, grievance_id: uuid.UUID, owner_id: uuid.UUID, units: Iterable[str], data: dict) -> GrievanceEvent:
+        self.sequence += 1
+        event = GrievanceEvent(
+            f"{self.epoch}:{self.sequence}", type, grievance_id, owner_id, tuple(dict.fromkeys(units)), data
+        )
+        self.replay.append(event)
+        EVENTS_PUBLISHED.inc(type)
+        for subscription in list(self.subscribers):
+            if subscription.wants(event):
+                self._deliver(subscription, event)
+        return event
+
+    def subscribe(self, visible: Visibility, last_event_id: Optional[str] = None) -> Tuple[Subscription, Optional[List[GrievanceEvent]]]:
+        """Register a subscriber and return it with the events it missed.
+
+        The missed events are None when `last_event_id` cannot be resumed
+        from (unknown epoch, or older than the replay buffer); the client
+        should then reload what it holds.
+        """
+        subscription = Subscription(visible)
+        missed: Optional[List[GrievanceEvent]] = []
+        if last_event_id:
+            missed = self._since(last_event_id)
+            if missed is not None:
+                missed = [event for event in missed if subscription.wants(event)]
+        self.subscribers.add(subscription)
+        EVENT_SUBSCRIBERS.set(value=len(self.subscribers))
+        return subscription, missed
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscribers.discard(subscription)
+        EVENT_SUBSCRIBERS.set(value=len(self.subscribers))
+
+    def close(self) -> None:
+        """End every stream, e.g. on shutdown."""
+        for subscription in list(self.subscribers):
+            self._drop(subscription, None)
+
+    def _since(self, last_event_id: str) -> Optional[List[GrievanceEvent]]:
+        epoch, _, sequence = last_event_id.partition(":")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        sequence = int(sequence)
+        if sequence > self.sequence:
+            return None
+        oldest = self.sequence - len(self.replay) + 1
+        if sequence + 1 < oldest:
+            return None
+        return list(self.replay)[sequence + 1 - oldest:]
+
+    def _deliver(self, subscription: Subscription, event: GrievanceEvent) -> None:
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Buffering without bound for a client that cannot keep up would
+            # let it exhaust memory; it reconnects and resumes from the replay
+            # buffer instead
+            self._drop(subscription, "slow")
+
+    def _drop(self, subscription: Subscription, reason: Optional[str]) -> None:
+        self.unsubscribe(subscription)
+        if reason:
+            EVENT_SUBSCRIBERS_DROPPED.inc(reason)
+        # Make room for the end-of-stream marker
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+event_hub = EventHub()
+
+def reset_message() -> bytes:
+    """Tells the client it missed events that cannot be replayed and should reload."""
+    return b"event: reset\ndata: {}\n\n"
+
+async def event_stream(hub: EventHub, visible: Visibility, last_event_id: Optional[str] = None):
+    """SSE body for one subscriber: missed events, then live events with heartbeats.
+
+    Subscribes only once the body starts, so a response that is never sent
+    leaves no subscriber behind.
+    """
+    subscription, missed = hub.subscribe(visible, last_event_id)
+    try:
+        yield f"retry: {EVENTS_RETRY_MS}\n\n".encode()
+        if missed is None:
+            yield reset_message()
+        else:
+            for event in missed:
+                yield event.encode()
+        last_sent = time.monotonic()
+        while True:
+            timeout = EVENTS_HEARTBEAT_SECONDS - (time.monotonic() - last_sent)
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), max(timeout, 0))
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                last_sent = time.monotonic()
+                continue
+            if event is None:
+                return
+            yield event.encode()
+            last_sent = time.monotonic()
+    finally:
+        hub.unsubscribe(subscription)
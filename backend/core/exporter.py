@@ -0,0 +1,53 @@
+import csv
+import enum
+import io
+import json
+import os
+from typing import Iterable
+from schemas.grievance import GrievanceRead
+
+# Grievances fetched from the database and written out per chunk
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+    @property
+    def media_type(self) -> str:
+        return "text/csv" if self == ExportFormat.csv else "application/x-ndjson"
+
+class ExportWriter:
+    """Serialises grievances chunk by chunk, so only one chunk is ever held as text.
+
+    In CSV, notes (when included) are one column holding a JSON array.
+    """
+
+    def __init__(self, fmt: ExportFormat, include_notes: bool):
+        self.fmt = fmt
+        self.include_notes = include_notes
+        self.fields = [name for name in GrievanceRead.model_fields if include_notes or name != "notes"]
+
+    def header(self) -> str:
+        if self.fmt != ExportFormat.csv:
+            return ""
+        return self._csv_rows([self.fields])
+
+    def chunk(self, grievances: Iterable[GrievanceRead]) -> str:
+        exclude = None if self.include_notes else {"notes"}
+        if self.fmt == ExportFormat.ndjson:
+            return "".join(grievance.model_dump_json(exclude=exclude) + "\n" for grievance in grievances)
+
+        rows = []
+        for grievance in grievances:
+            values = grievance.model_dump(mode="json", exclude=exclude)
+            if self.include_notes:
+                values["notes"] = json.dumps(values["notes"])
+            rows.append([values[name] for name in self.fields])
+        return self._csv_rows(rows)
+
+    @staticmethod
+    def _csv_rows(rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+from fastapi import HTTPException, status
+from fastapi_users.password import PasswordHelper
+from core.metrics import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_QUEUED, PASSWORD_HASH_REJECTED, PASSWORD_HASH_WAIT
+
+# "pool" hashes on worker threads; "inline" hashes on the event loop, as
+# fastapi-users does by default (only useful as a benchmark baseline)
+PASSWORD_HASH_MODE = os.getenv("PASSWORD_HASH_MODE", "pool")
+# Hashes running at once. Argon2 and bcrypt release the GIL, so threads
+# use separate cores; each Argon2 hash also holds 64 MiB while it runs.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Hashes allowed to wait for a worker; beyond this, logins get a 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "256"))
+
+T = TypeVar("T")
+
+class PasswordHashPool:
+    """Runs password hashing and verification on a bounded thread pool.
+
+    At most `workers` hashes run at once and at most `max_queue` wait for
+    a slot; further requests are turned away with 503 rather than piling
+    up behind a login storm.
+    """
+
+    def __init__(
+        self,
+        helper: Optional[PasswordHelper] = None,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+        mode: str = PASSWORD_HASH_MODE,
+    ):
+        self.helper = helper or PasswordHelper()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.mode = mode
+        self.queued = 0
+        self._slots = asyncio.Semaphore(workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.helper.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._run("verify", self.helper.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        # A semaphore that has been waited on is bound to its event loop
+        self._slots = asyncio.Semaphore(self.workers)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, operation: str, fn: Callable[..., T], *args) -> T:
+        if self.mode == "inline":
+            return fn(*args)
+        if self.queued >= self.max_queue:
+            PASSWORD_HASH_REJECTED.inc(operation)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-in attempts in progress, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.queued += 1
+        PASSWORD_HASH_QUEUED.set(value=self.queued)
+        queued_at = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+            PASSWORD_HASH_QUEUED.set(value=self.queued)
+        PASSWORD_HASH_WAIT.observe(operation, value=time.perf_counter() - queued_at)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+        PASSWORD_HASH_IN_FLIGHT.inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            PASSWORD_HASH_IN_FLIGHT.dec()
+            self._slots.release()
+
+password_hasher = PasswordHashPool()
@@ -0,0 +1,186 @@
+import codecs
+import csv
+import enum
+import json
+import logging
+import os
+import uuid
+from typing import AsyncIterator, List, Tuple, Union
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.cache import response_cache
+from models.grievance import Grievance
+from schemas.grievance import GrievanceCreate, GrievanceImportError, GrievanceImportResult
+
+logger = logging.getLogger(__name__)
+
+# Rows per executemany; each batch is committed on its own
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+# Errors beyond this are counted but not listed, so a bad file cannot grow
+# the report without bound
+MAX_REPORTED_ERRORS = 1000
+
+class ImportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+    @classmethod
+    def from_content_type(cls, content_type: str) -> "ImportFormat":
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in ("text/csv", "application/csv"):
+            return cls.csv
+        if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            return cls.ndjson
+        raise ValueError(f"Unsupported content type {media_type or '(none)'}")
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream as UTF-8 (with or without BOM) and yield it line by line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+Record = Tuple[int, Union[dict, str]]
+
+async def iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Yield (line number, row dict) per CSV record; the first record is the header.
+
+    A quoted field may span lines, so lines are gathered until the record's
+    quotes balance before parsing it.
+    """
+    header = None
+    record, start = "", 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not record:
+            start = line_no
+            if not line.strip():
+                continue
+        record = f"{record}\n{line}" if record else line
+        if record.count('"') % 2:
+            continue
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as e:
+            yield start, f"Malformed CSV: {e}"
+            record = ""
+            continue
+        record = ""
+        if header is None:
+            header = [name.strip() for name in values]
+        elif len(values) != len(header):
+            yield start, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            yield start, dict(zip(header, values))
+    if record:
+        yield start, "Unterminated quoted field"
+
+async def iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Record]:
+    """Yield (line number, object) per non-blank NDJSON line."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(value, dict):
+            yield line_no, "Expected a JSON object"
+            continue
+        yield line_no, value
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[Record]:
+    lines = iter_lines(chunks)
+    return iter_csv(lines) if fmt == ImportFormat.csv else iter_ndjson(lines)
+
+def _describe(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()
+    )
+
+class _Report:
+    def __init__(self):
+        self.result = GrievanceImportResult()
+
+    def error(self, line: int, message: str):
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(GrievanceImportError(line=line, error=message))
+        else:
+            self.result.errors_truncated = True
+
+def _invalidate(batch: List[Tuple[int, dict]]):
+    owners = {row["user_id"] for _, row in batch}
+    units = {row["unit"] for _, row in batch}
+    response_cache.invalidate({
+        "grievances:all",
+        *(f"grievances:user:{owner}" for owner in owners),
+        *(f"grievances:unit:{unit}" for unit in units),
+    })
+
+async def _insert_batch(session: AsyncSession, batch: List[Tuple[int, dict]], report: _Report):
+    try:
+        await session.execute(insert(Grievance), [row for _, row in batch])
+        await session.commit()
+        report.result.inserted += len(batch)
+        _invalidate(batch)
+        return
+    except SQLAlchemyError:
+        await session.rollback()
+    # Something in the batch was rejected by the database; retry row by row
+    # so only the offending rows are reported
+    for line, row in batch:
+        try:
+            async with session.begin_nested():
+                await session.execute(insert(Grievance), [row])
+            report.result.inserted += 1
+        except SQLAlchemyError as e:
+            report.error(line, f"Rejected by database: {e.orig or e}")
+    await session.commit()
+    _invalidate(batch)
+
+async def import_grievances(
+    session: AsyncSession,
+    records: AsyncIterator[Record],
+    user_id: uuid.UUID,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> GrievanceImportResult:
+    """Validate records against GrievanceCreate and insert them for `user_id` in batches.
+
+    Invalid rows are reported by line number and skipped; the rest of their
+    batch is still inserted. Only one batch is held in memory at a time.
+    """
+    report = _Report()
+    batch: List[Tuple[int, dict]] = []
+    async for line, record in records:
+        if isinstance(record, str):
+            report.error(line, record)
+            continue
+        try:
+            grievance = GrievanceCreate.model_validate(record)
+        except ValidationError as e:
+            report.error(line, _describe(e))
+            continue
+        batch.append((line, {**grievance.model_dump(), "user_id": user_id}))
+        if len(batch) >= batch_size:
+            await _insert_batch(session, batch, report)
+            batch = []
+    if batch:
+        await _insert_batch(session, batch, report)
+
+    logger.info(
+        "Imported grievances", extra={"inserted": report.result.inserted, "failed": report.result.failed}
+    )
+    return report.result
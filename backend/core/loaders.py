@@ -0,0 +1,46 @@
+import uuid
+from typing import Dict, Iterable, Optional
+from fastapi import Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_session
+from models.user import User
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lists
+BATCH_SIZE = 500
+
+class UserLoader:
+    """Batches and caches user lookups for the lifetime of one request.
+
+    Callers hand over every user id they need at once; ids already seen in
+    this request are served from memory, the rest are fetched with a single
+    `WHERE id IN (...)` per batch instead of one query per id.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._names: Dict[uuid.UUID, Optional[str]] = {}
+
+    async def load_names(self, user_ids: Iterable[uuid.UUID]) -> Dict[uuid.UUID, str]:
+        """Map each id to the user's display name (name, falling back to email)."""
+        user_ids = set(user_ids)
+        missing = [user_id for user_id in user_ids if user_id not in self._names]
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            result = await self.session.execute(
+                select(User.id, User.name, User.email).where(User.id.in_(batch))
+            )
+            for row in result:
+                self._names[row.id] = row.name or row.email
+            for user_id in batch:
+                self._names.setdefault(user_id, None)
+        return {
+            user_id: self._names[user_id]
+            for user_id in user_ids
+            if self._names[user_id] is not None
+        }
+
+async def get_user_loader(session: AsyncSession = Depends(get_async_session)) -> UserLoader:
+    # FastAPI caches dependencies per request, so every route parameter and
+    # sub-dependency asking for a loader shares this instance and its session.
+    return UserLoader(session)
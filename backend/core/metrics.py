@@ -0,0 +1,235 @@
+import asyncio
+import bisect
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Tuple
+
+from starlette.routing import Match
+
+# When uvicorn runs several workers, each one periodically writes its samples
+# to <METRICS_MULTIPROC_DIR>/<pid>.json and /metrics merges every file.
+MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# All recording happens on the event loop thread of the owning worker, so the
+# metric types below mutate plain dicts with no locking.
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.samples: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) + amount
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.samples[labels] = self.samples.get(labels, 0) - amount
+
+    def set(self, *labels: str, value: float) -> None:
+        self.samples[labels] = value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *labels: str, value: float) -> None:
+        sample = self.samples.get(labels)
+        if sample is None:
+            # Per-bucket (non-cumulative) counts plus +Inf, then sum and count
+            sample = self.samples[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        sample[0][bisect.bisect_left(self.buckets, value)] += 1
+        sample[1] += value
+        sample[2] += 1
+
+REGISTRY: List[Metric] = []
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "HTTP requests currently being handled.", ("method", "route"))
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+LOGINS = Counter("auth_logins_total", "Login attempts by outcome.", ("result",))
+CACHE_REQUESTS = Counter("cache_requests_total", "Response cache lookups by outcome (hit or miss).", ("cache", "result"))
+CACHE_EVICTIONS = Counter("cache_evictions_total", "Response cache entries dropped, by reason (lru, expired, invalidated).", ("cache", "reason"))
+CACHE_ENTRIES = Gauge("cache_entries", "Entries currently held in a response cache.", ("cache",))
+PASSWORD_HASH_QUEUED = Gauge("password_hash_queued", "Password hashes waiting for a worker thread.")
+PASSWORD_HASH_IN_FLIGHT = Gauge("password_hash_in_flight", "Password hashes currently running on worker threads.")
+PASSWORD_HASH_WAIT = Histogram("password_hash_wait_seconds", "Time a password hash waited for a worker, by operation (hash or verify).", ("operation",))
+PASSWORD_HASH_REJECTED = Counter("password_hash_rejected_total", "Password hashes refused because the queue was full, by operation.", ("operation",))
+EVENTS_PUBLISHED = Counter("events_published_total", "Grievance change events published, by type.", ("type",))
+EVENT_SUBSCRIBERS = Gauge("event_subscribers", "Open grievance event streams.")
+EVENT_SUBSCRIBERS_DROPPED = Counter("event_subscribers_dropped_total", "Event streams closed by the server, by reason (slow).", ("reason",))
+OUTBOX_DEPTH = Gauge("outbox_depth", "Notification outbox rows waiting to be sent.")
+OUTBOX_LAG = Gauge("outbox_lag_seconds", "Age of the oldest notification outbox row still waiting to be sent.")
+OUTBOX_DEAD = Gauge("outbox_dead_letters", "Notification outbox rows given up on after OUTBOX_MAX_ATTEMPTS.")
+OUTBOX_EVENTS = Counter("outbox_events_total", "Notification outbox rows processed, by result (sent, retried or dead).", ("result",))
+OUTBOX_DIGESTS = Counter("outbox_digests_total", "Digest emails attempted, by result (sent or failed).", ("result",))
+OUTBOX_DELIVERY_DELAY = Histogram(
+    "outbox_delivery_delay_seconds", "Time from an outbox row being written to its digest being sent.",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 900, 1800, 3600, 14400),
+)
+
+def snapshot() -> dict:
+    return {
+        metric.name: [[list(labels), value] for labels, value in metric.samples.items()]
+        for metric in REGISTRY
+    }
+
+def _write_file(data: str) -> None:
+    path = os.path.join(MULTIPROC_DIR, f"{os.getpid()}.json")
+    with open(f"{path}.tmp", "w") as f:
+        f.write(data)
+    os.replace(f"{path}.tmp", path)  # Readers never see a half-written file
+
+def write_snapshot() -> None:
+    """Publish this worker's samples for the other workers' /metrics to merge."""
+    if MULTIPROC_DIR:
+        _write_file(json.dumps(snapshot()))
+
+async def run_snapshot_writer() -> None:
+    """Background task publishing this worker's samples every SNAPSHOT_INTERVAL.
+
+    The directory should be emptied before the server starts; counters from
+    files left by earlier runs would otherwise keep accumulating.
+    """
+    if not MULTIPROC_DIR:
+        return
+    os.makedirs(MULTIPROC_DIR, exist_ok=True)
+    while True:
+        # Serialize on the loop thread, where the samples are mutated, and
+        # only hand the file write to a worker thread.
+        await asyncio.to_thread(_write_file, json.dumps(snapshot()))
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def collect() -> dict:
+    """Merge samples from every worker: counters and histograms sum across all
+    snapshots ever written, gauges only across workers that are still alive."""
+    if not MULTIPROC_DIR:
+        return snapshot()
+    write_snapshot()
+    kinds = {metric.name: metric.kind for metric in REGISTRY}
+    merged: Dict[str, Dict[Tuple[str, ...], object]] = {name: {} for name in kinds}
+    for path in glob.glob(os.path.join(MULTIPROC_DIR, "*.json")):
+        pid = int(os.path.basename(path).split(".")[0])
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, samples in data.items():
+            if name not in kinds or (kinds[name] == "gauge" and not _pid_alive(pid)):
+                continue
+            for labels, value in samples:
+                labels = tuple(labels)
+                current = merged[name].get(labels)
+                if current is None:
+                    merged[name][labels] = value
+                elif kinds[name] == "histogram":
+                    current[0] = [a + b for a, b in zip(current[0], value[0])]
+                    current[1] += value[1]
+                    current[2] += value[2]
+                else:
+                    merged[name][labels] = current + value
+    return {name: [[list(labels), value] for labels, value in samples.items()] for name, samples in merged.items()}
+
+def _format_labels(names, values, extra=()) -> str:
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def render() -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    samples = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for labels, value in samples.get(metric.name, []):
+            if metric.kind != "histogram":
+                lines.append(f"{metric.name}{_format_labels(metric.labels, labels)} {value}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, bucket_count in zip([*metric.buckets, "+Inf"], counts):
+                cumulative += bucket_count
+                le = (("le", bound),)
+                lines.append(f"{metric.name}_bucket{_format_labels(metric.labels, labels, le)} {cumulative}")
+            lines.append(f"{metric.name}_sum{_format_labels(metric.labels, labels)} {total}")
+            lines.append(f"{metric.name}_count{_format_labels(metric.labels, labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """Records count, latency and in-flight requests per route template.
+
+    The route is resolved before dispatch so the in-flight gauge can carry
+    it; paths that match no route share a single "unmatched" label to keep
+    label cardinality bounded.
+    """
+
+    def __init__(self, app, routes_app=None):
+        self.app = app
+        self.routes_app = routes_app
+
+    def route_template(self, scope) -> str:
+        for route in self.routes_app.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        route = self.route_template(scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc(method, route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_LATENCY.observe(method, route, value=time.perf_counter() - started)
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_IN_PROGRESS.dec(method, route)
@@ -0,0 +1,352 @@
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import random
+import smtplib
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+from sqlalchemy import JSON, DateTime, String, delete, func, insert, literal, or_, select, union, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import DATABASE_URL, async_session_maker
+from core.metrics import OUTBOX_DEAD, OUTBOX_DELIVERY_DELAY, OUTBOX_DEPTH, OUTBOX_DIGESTS, OUTBOX_EVENTS, OUTBOX_LAG
+from models.grievance import Grievance, Note
+from models.outbox import OutboxMessage
+from models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# "off" leaves the outbox to fill up, e.g. when a separate process drains it
+OUTBOX_WORKER = os.getenv("OUTBOX_WORKER", "on")
+# Recipients given a digest per pass
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+# A new row waits this long before it is sent, so a burst of changes reaches
+# each recipient as one digest instead of one email per change
+OUTBOX_DIGEST_SECONDS = float(os.getenv("OUTBOX_DIGEST_SECONDS", "60"))
+# Failed digests are retried after OUTBOX_BACKOFF_SECONDS, doubling per
+# attempt up to OUTBOX_BACKOFF_MAX_SECONDS, and dropped after the last attempt
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "3600"))
+# Rows given up on are kept this long for inspection, then deleted
+OUTBOX_DEAD_RETENTION_DAYS = float(os.getenv("OUTBOX_DEAD_RETENTION_DAYS", "30"))
+# How long a claimed row stays hidden from other workers; must outlast a batch of sends
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+# Only the worker process holding this lock drains the outbox; one per database
+OUTBOX_LOCK_PATH = os.getenv(
+    "OUTBOX_LOCK_PATH",
+    os.path.join(tempfile.gettempdir(), f"grievance-outbox-{hashlib.sha1(DATABASE_URL.encode()).hexdigest()[:12]}.lock"),
+)
+# Notes are quoted in digests up to this many characters
+NOTE_PREVIEW_CHARS = 500
+
+# Without SMTP_HOST, digests are logged instead of sent
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() == "true"
+SMTP_TIMEOUT_SECONDS = float(os.getenv("SMTP_TIMEOUT_SECONDS", "30"))
+SMTP_FROM = os.getenv("SMTP_FROM", "grievances@localhost")
+
+def _utcnow() -> datetime:
+    # Timestamps are stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+async def enqueue_notifications(
+    session: AsyncSession,
+    event_type: str,
+    grievance: Grievance,
+    note: Optional[Note] = None,
+    actor: Optional[User] = None,
+) -> None:
+    """Queue an email about `grievance` (or a new `note` on it) for its unit's supervisors and its submitter.
+
+    One INSERT ... SELECT in the caller's transaction, so the rows commit or
+    roll back with the change they describe. The submitter is the contact
+    address on the grievance. `actor` is left out of the recipients, so
+    nobody is emailed about their own note.
+    """
+    now = _utcnow()
+    payload = {"title": grievance.title, "unit": grievance.unit, "status": grievance.status.value}
+    if note is not None:
+        payload["author"] = (actor.name or actor.email) if actor else None
+        payload["content"] = note.content[:NOTE_PREVIEW_CHARS]
+
+    supervisors = select(User.email.label("recipient")).where(
+        User.role == UserRole.supervisor, User.unit == grievance.unit, User.is_active
+    )
+    recipients = union(supervisors, select(literal(grievance.email, String).label("recipient"))).subquery()
+    rows = select(
+        recipients.c.recipient,
+        literal(event_type, String),
+        literal(grievance.id, OutboxMessage.grievance_id.type),
+        literal(payload, JSON),
+        literal(now, DateTime),
+        literal(now + timedelta(seconds=OUTBOX_DIGEST_SECONDS), DateTime),
+    ).where(recipients.c.recipient != "")
+    if actor is not None and note is not None:
+        rows = rows.where(recipients.c.recipient != actor.email)
+    await session.execute(insert(OutboxMessage).from_select(
+        ["recipient", "event_type", "grievance_id", "payload", "created_at", "available_at"], rows
+    ))
+
+def _describe(row) -> str:
+    payload = row.payload
+    when = row.created_at.strftime("%Y-%m-%d %H:%M UTC")
+    if row.event_type == "note.created":
+        return f'New note on "{payload["title"]}" ({payload["unit"]}) by {payload["author"]}, {when}:\n    {payload["content"]}'
+    return f'New grievance "{payload["title"]}" ({payload["unit"]}) submitted {when}.'
+
+def build_digest(recipient: str, rows: list) -> EmailMessage:
+    """One email listing every event queued for `recipient`, oldest first."""
+    rows = sorted(rows, key=lambda row: (row.created_at, row.id))
+    message = EmailMessage()
+    message["From"] = SMTP_FROM
+    message["To"] = recipient
+    if len(rows) > 1:
+        message["Subject"] = f"{len(rows)} grievance updates"
+    elif rows[0].event_type == "note.created":
+        message["Subject"] = f'New note on "{rows[0].payload["title"]}"'
+    else:
+        message["Subject"] = f'New grievance "{rows[0].payload["title"]}"'
+    message.set_content("\n\n".join(_describe(row) for row in rows) + "\n")
+    return message
+
+class LogMailer:
+    """Logs each digest instead of sending it; used when SMTP_HOST is not set."""
+
+    def send(self, messages: List[EmailMessage]) -> Dict[str, str]:
+        for message in messages:
+            logger.info("Notification digest (SMTP_HOST not set, not sent)", extra={"to": message["To"], "subject": message["Subject"]})
+        return {}
+
+class SmtpMailer:
+    """Sends digests over one SMTP connection per batch. Blocking; run it on a thread."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int = SMTP_PORT,
+        username: Optional[str] = SMTP_USERNAME,
+        password: Optional[str] = SMTP_PASSWORD,
+        starttls: bool = SMTP_STARTTLS,
+        timeout: float = SMTP_TIMEOUT_SECONDS,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, messages: List[EmailMessage]) -> Dict[str, str]:
+        """Send every message and return the error for each recipient that was refused.
+
+        Connection and login failures raise, failing the whole batch.
+        """
+        failures = {}
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            for message in messages:
+                try:
+                    smtp.send_message(message)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    failures[message["To"]] = str(e)
+        return failures
+
+def default_mailer():
+    return SmtpMailer(SMTP_HOST) if SMTP_HOST else LogMailer()
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, so recipients that failed together do not retry together."""
+    delay = min(OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+def _unlocked(now: datetime):
+    return or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until <= now)
+
+def due_recipients_query(now: datetime, limit: int):
+    """Recipients with a row ready to send, those waiting longest first."""
+    # Materialized so SQLite seeks the due rows on ix_outbox_available and
+    # groups only those; inlined, it walks all of ix_outbox_recipient for
+    # the GROUP BY, rows still waiting or given up on included
+    due = (
+        select(OutboxMessage.recipient, OutboxMessage.available_at)
+        .where(OutboxMessage.available_at <= now, _unlocked(now))
+        .cte("due")
+        .prefix_with("MATERIALIZED")
+    )
+    return select(due.c.recipient).group_by(due.c.recipient).order_by(func.min(due.c.available_at)).limit(limit)
+
+def purge_dead_query(now: datetime):
+    """Delete rows given up on more than OUTBOX_DEAD_RETENTION_DAYS after they were queued."""
+    return delete(OutboxMessage).where(
+        OutboxMessage.available_at.is_(None),
+        OutboxMessage.created_at < now - timedelta(days=OUTBOX_DEAD_RETENTION_DAYS),
+    )
+
+def outbox_depth_query():
+    """Rows still to be sent and the creation time of the oldest."""
+    return select(func.count(), func.min(OutboxMessage.created_at)).where(OutboxMessage.available_at.is_not(None))
+
+def _try_lock(path: str) -> Optional[int]:
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+class OutboxWorker:
+    """Drains the notification outbox into per-recipient digests.
+
+    Each pass claims every pending row of up to `batch_size` recipients
+    that have a due row, sends one digest per recipient, deletes what was
+    sent and schedules a retry for the rest. Claims are leases, so a
+    worker that dies mid-send leaves its rows to be sent again: delivery
+    is at least once.
+    """
+
+    def __init__(
+        self,
+        session_maker=async_session_maker,
+        mailer=None,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        lock_path: str = OUTBOX_LOCK_PATH,
+    ):
+        self.session_maker = session_maker
+        self.mailer = mailer or default_mailer()
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lock_path = lock_path
+
+    async def drain_once(self) -> int:
+        """Run one pass and return the number of digests attempted."""
+        now = _utcnow()
+        rows = await self._claim(now)
+        if not rows:
+            return 0
+        by_recipient = defaultdict(list)
+        for row in rows:
+            by_recipient[row.recipient].append(row)
+        messages = [build_digest(recipient, recipient_rows) for recipient, recipient_rows in by_recipient.items()]
+        try:
+            failures = await asyncio.to_thread(self.mailer.send, messages)
+        except (OSError, smtplib.SMTPException) as e:
+            logger.warning("Could not send notification digests", extra={"digests": len(messages), "error": str(e)})
+            failures = {recipient: str(e) for recipient in by_recipient}
+        sent = [row for recipient, recipient_rows in by_recipient.items() if recipient not in failures for row in recipient_rows]
+        failed = {recipient: by_recipient[recipient] for recipient in failures if recipient in by_recipient}
+        await self._settle(sent, failed, failures)
+        OUTBOX_DIGESTS.inc("sent", amount=len(by_recipient) - len(failed))
+        OUTBOX_DIGESTS.inc("failed", amount=len(failed))
+        sent_at = _utcnow()
+        for row in sent:
+            OUTBOX_DELIVERY_DELAY.observe(value=(sent_at - row.created_at).total_seconds())
+        return len(messages)
+
+    async def _claim(self, now: datetime) -> list:
+        # Rows of those recipients still inside their digest window or
+        # backoff ride along, so each recipient gets everything in one email
+        claim = (
+            update(OutboxMessage)
+            .where(
+                OutboxMessage.recipient.in_(due_recipients_query(now, self.batch_size)),
+                OutboxMessage.available_at.is_not(None),
+                _unlocked(now),
+            )
+            .values(locked_until=now + timedelta(seconds=OUTBOX_LEASE_SECONDS), attempts=OutboxMessage.attempts + 1)
+            .returning(
+                OutboxMessage.id, OutboxMessage.recipient, OutboxMessage.event_type,
+                OutboxMessage.payload, OutboxMessage.created_at, OutboxMessage.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with self.session_maker() as session:
+            rows = (await session.execute(claim)).all()
+            await session.commit()
+        return rows
+
+    async def _settle(self, sent: list, failed: Dict[str, list], errors: Dict[str, str]) -> None:
+        now = _utcnow()
+        async with self.session_maker() as session:
+            if sent:
+                await session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_([row.id for row in sent])))
+            for recipient, rows in failed.items():
+                # A digest is retried as a whole, on the schedule of its most-tried row
+                attempts = max(row.attempts for row in rows)
+                if attempts >= OUTBOX_MAX_ATTEMPTS:
+                    available_at, result = None, "dead"
+                    logger.error(
+                        "Giving up on notification digest",
+                        extra={"recipient": recipient, "events": len(rows), "attempts": attempts, "error": errors[recipient]},
+                    )
+                else:
+                    available_at, result = now + timedelta(seconds=retry_delay(attempts)), "retried"
+                await session.execute(
+                    update(OutboxMessage)
+                    .where(OutboxMessage.id.in_([row.id for row in rows]))
+                    .values(available_at=available_at, locked_until=None, last_error=errors[recipient])
+                    .execution_options(synchronize_session=False)
+                )
+                OUTBOX_EVENTS.inc(result, amount=len(rows))
+            await session.commit()
+        OUTBOX_EVENTS.inc("sent", amount=len(sent))
+
+    async def purge_dead(self) -> None:
+        async with self.session_maker() as session:
+            purged = (await session.execute(purge_dead_query(_utcnow()))).rowcount
+            await session.commit()
+        if purged:
+            logger.info("Purged dead notification rows", extra={"rows": purged})
+
+    async def refresh_metrics(self) -> None:
+        async with self.session_maker() as session:
+            depth, oldest = (await session.execute(outbox_depth_query())).one()
+            dead = await session.scalar(select(func.count()).where(OutboxMessage.available_at.is_(None)))
+        OUTBOX_DEPTH.set(value=depth)
+        OUTBOX_LAG.set(value=(_utcnow() - oldest).total_seconds() if oldest else 0)
+        OUTBOX_DEAD.set(value=dead)
+
+    async def run(self) -> None:
+        """Drain until cancelled. Worker processes that do not hold the lock
+        stand by and take over if its holder exits; only the holder reports
+        the depth, lag and dead-letter gauges, so they are not multiplied
+        across workers."""
+        fd = None
+        try:
+            while (fd := _try_lock(self.lock_path)) is None:
+                await asyncio.sleep(self.poll_seconds)
+            while True:
+                digests = 0
+                try:
+                    digests = await self.drain_once()
+                    await self.purge_dead()
+                    await self.refresh_metrics()
+                except Exception:
+                    logger.exception("Outbox pass failed")
+                # A full batch means more is probably due; go again right away
+                if digests < self.batch_size:
+                    await asyncio.sleep(self.poll_seconds)
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+outbox_worker = OutboxWorker()
+
+async def run_outbox_worker() -> None:
+    """Background task draining the notification outbox (unless OUTBOX_WORKER=off)."""
+    if OUTBOX_WORKER == "off":
+        return
+    await outbox_worker.run()
@@ -0,0 +1,77 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import literal_column, tuple_, union_all
+
+def encode_cursor(sort_field: str, value: datetime, row_id: uuid.UUID) -> str:
+    """Encode the (sort value, id) position of the last row on a page as an opaque token."""
+    payload = json.dumps([sort_field, value.isoformat(), row_id.hex]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort_field: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_field, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_field != sort_field:
+            raise ValueError("cursor was issued for a different sort")
+        return datetime.fromisoformat(value), uuid.UUID(row_id)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_seek(query, model, cursor: Optional[str], sort_field: str = "created_at", descending: bool = False):
+    """Restrict a select to the rows after `cursor` in (sort_field, id) order.
+
+    The seek is a row-value comparison, which SQLite turns into a range search
+    on any index ending in (sort_field, id); an expanded OR would not.
+    """
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_field)
+        position = tuple_(getattr(model, sort_field), model.id)
+        bound = tuple_(value, row_id)
+        query = query.where(position < bound if descending else position > bound)
+    return query
+
+def keyset_page(query, model, cursor: Optional[str], limit: int, sort_field: str = "created_at", descending: bool = False):
+    """Restrict a select to the page after `cursor`, ordered by (sort_field, id).
+
+    One extra row is fetched so the caller can tell whether another page exists.
+    """
+    sort_column = getattr(model, sort_field)
+    query = keyset_seek(query, model, cursor, sort_field, descending)
+    if descending:
+        return query.order_by(sort_column.desc(), model.id.desc()).limit(limit + 1)
+    return query.order_by(sort_column, model.id).limit(limit + 1)
+
+def keyset_union_page(queries, model, cursor: Optional[str], limit: int, sort_field: str = "created_at", descending: bool = False):
+    """keyset_page over the UNION ALL of disjoint selects, each of which must select sort_field and id.
+
+    SQLite answers an OR of conditions on different indexes with a MULTI-INDEX
+    OR and sorts every matching row before it can apply the LIMIT. Split into
+    branches that each walk their own (..., sort_field, id) index, it merges
+    the ordered scans instead (MERGE (UNION ALL)) and stops after the page.
+    """
+    if len(queries) == 1:
+        return keyset_page(queries[0], model, cursor, limit, sort_field, descending)
+    compound = union_all(*(keyset_seek(query, model, cursor, sort_field, descending) for query in queries))
+    # A compound is ordered by its result columns, named here by position: a
+    # bare name such as id would be ambiguous in a branch that joins users
+    names = [column.name for column in queries[0].selected_columns]
+    sort_column, id_column = (literal_column(str(names.index(name) + 1)) for name in (sort_field, "id"))
+    if descending:
+        return compound.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+    return compound.order_by(sort_column, id_column).limit(limit + 1)
+
+def split_page(rows, limit: int, sort_field: str = "created_at"):
+    """Trim the look-ahead row and build the next cursor from the last row kept."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort_field, getattr(last, sort_field), last.id)
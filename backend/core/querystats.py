@@ -0,0 +1,122 @@
+import contextvars
+import logging
+import os
+import time
+import warnings
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+APP_ENV = os.getenv("APP_ENV", "production")
+# Requests slower than this are logged with their query totals
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+# The same SQL text executed more than this many times in one request is
+# treated as an N+1 pattern
+REPEATED_QUERY_LIMIT = int(os.getenv("REPEATED_QUERY_LIMIT", "5"))
+# What to do about it: "off", "warn" or "raise". Defaults to raising under
+# tests, warning in development and staying silent in production.
+REPEATED_QUERY_ACTION = os.getenv(
+    "REPEATED_QUERY_ACTION",
+    {"test": "raise", "development": "warn"}.get(APP_ENV, "off"),
+)
+
+class RepeatedQueryError(RuntimeError):
+    """Raised when one request runs the same statement more than REPEATED_QUERY_LIMIT times."""
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    db_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    flagged: set = field(default_factory=set)
+    repeats_allowed: bool = False
+
+# Stats of the request being handled; None outside a request
+query_stats_var: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+def allow_repeated_queries() -> None:
+    """Exempt the current request from the N+1 check, for deliberate batch loops."""
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.repeats_allowed = True
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = query_stats_var.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.db_seconds += time.perf_counter() - started
+
+    if REPEATED_QUERY_ACTION == "off" or stats.repeats_allowed:
+        return
+    stats.statements[statement] += 1
+    if stats.statements[statement] > REPEATED_QUERY_LIMIT and statement not in stats.flagged:
+        stats.flagged.add(statement)
+        message = (
+            f"Statement ran {stats.statements[statement]} times in one request "
+            f"(limit {REPEATED_QUERY_LIMIT}), likely an N+1 pattern: {statement}"
+        )
+        if REPEATED_QUERY_ACTION == "raise":
+            raise RepeatedQueryError(message)
+        warnings.warn(message, stacklevel=2)
+
+def _handle_error(exception_context):
+    # Keep the timing stack balanced when a statement fails
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+def instrument_engine(engine) -> None:
+    """Attach the per-request statement counters to an (async) engine."""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+class QueryStatsMiddleware:
+    """Collects query totals per request and reports them in a Server-Timing header.
+
+    The header carries `db` (time spent in the database, with the statement
+    count as description) and `app` (total time up to the response start), so
+    browser devtools show the split for every API call.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = QueryStats()
+        token = query_stats_var.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.count} queries", app;dur={elapsed_ms:.1f}'
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms > SLOW_REQUEST_MS:
+                logger.warning(
+                    "Slow request %s %s", scope["method"], scope["path"],
+                    extra={
+                        "duration_ms": round(elapsed_ms, 1),
+                        "db_ms": round(stats.db_seconds * 1000, 1),
+                        "queries": stats.count,
+                    },
+                )
+            query_stats_var.reset(token)
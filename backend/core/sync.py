@@ -0,0 +1,48 @@
+import base64
+import json
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+
+# Each sync pass starts this far before the previous one began, so a write
+# whose timestamp was taken before that moment but committed after it is
+# still picked up. Clients must treat repeated items as upserts.
+CHANGES_OVERLAP_SECONDS = float(os.getenv("CHANGES_OVERLAP_SECONDS", "5"))
+
+@dataclass(frozen=True)
+class SyncToken:
+    """Where a delta sync stands.
+
+    `watermark` is where the next pass starts. `after` is the (changed_at,
+    id) of the last change returned while a pass is still being paged
+    through; it is None once the client has caught up. `scope` is what the
+    caller's visibility depended on when the token was issued; tokens from
+    before it was recorded have None.
+    """
+    watermark: datetime
+    after: Optional[Tuple[datetime, uuid.UUID]] = None
+    scope: Optional[Tuple[str, Optional[str]]] = None
+
+def encode_sync_token(token: SyncToken) -> str:
+    after = [token.after[0].isoformat(), token.after[1].hex] if token.after else None
+    payload = json.dumps([token.watermark.isoformat(), after, list(token.scope) if token.scope else None]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_sync_token(value: str) -> SyncToken:
+    try:
+        padded = value + "=" * (-len(value) % 4)
+        watermark, after, *rest = json.loads(base64.urlsafe_b64decode(padded))
+        scope = rest[0] if rest else None
+        return SyncToken(
+            datetime.fromisoformat(watermark),
+            (datetime.fromisoformat(after[0]), uuid.UUID(after[1])) if after else None,
+            (scope[0], scope[1]) if scope else None,
+        )
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
@@ -1,8 +1,16 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from dataclasses import dataclass, fields, replace
 import os
+import time
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from core.metrics import DB_POOL_CHECKOUT_WAIT
+from core.querystats import instrument_engine
 
 # Check if we're running in Docker by checking for the /app directory
 IS_DOCKER = os.path.exists('/app')
@@ -18,14 +26,162 @@ else:
 
 DATABASE_URL = os.getenv('DATABASE_URL', DEFAULT_DB_URL)
 
-engine = create_async_engine(DATABASE_URL)
+@dataclass(frozen=True)
+class EngineProfile:
+    """Connection pragmas and pool sizing applied to the engine.
+
+    A field left as None keeps the SQLite / SQLAlchemy default.
+    """
+    name: str
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    busy_timeout_ms: Optional[int] = None
+    cache_size: Optional[int] = None  # Negative values are KiB, positive are pages
+    mmap_size: Optional[int] = None
+    temp_store: Optional[str] = None
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    pool_timeout: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> "EngineProfile":
+        """Pick DB_PROFILE, then apply any DB_<FIELD> overrides, e.g. DB_BUSY_TIMEOUT_MS=10000."""
+        profile = ENGINE_PROFILES[os.getenv("DB_PROFILE", "production")]
+        overrides = {}
+        for field in fields(cls):
+            value = os.getenv(f"DB_{field.name.upper()}")
+            if value is not None and field.name != "name":
+                overrides[field.name] = int(value) if field.type == Optional[int] else value
+        return replace(profile, **overrides)
+
+    def pragmas(self):
+        return {
+            "journal_mode": self.journal_mode,
+            "synchronous": self.synchronous,
+            "busy_timeout": self.busy_timeout_ms,
+            "cache_size": self.cache_size,
+            "mmap_size": self.mmap_size,
+            "temp_store": self.temp_store,
+        }
+
+ENGINE_PROFILES = {
+    # Plain create_async_engine() behavior
+    "default": EngineProfile(name="default"),
+    # WAL lets readers run alongside the single writer; NORMAL sync is durable
+    # across application crashes and only fsyncs at checkpoints. aiosqlite
+    # runs each connection on its own thread, so a handful of pooled
+    # connections is enough to keep readers from waiting on a writer.
+    #
+    # Writers queue for the lock rather than failing with "database is
+    # locked" because the driver (pysqlite's implicit transactions) only
+    # opens a transaction at the first INSERT/UPDATE/DELETE: a route's
+    # earlier SELECTs run outside it, so no read snapshot ever has to be
+    # upgraded to a write, which in WAL fails at once whatever the timeout.
+    # busy_timeout_ms only restates the driver's default 5 s wait so the
+    # profile does not depend on it; opening transactions with an explicit
+    # BEGIN would need BEGIN IMMEDIATE for writes to stay safe.
+    "production": EngineProfile(
+        name="production",
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        busy_timeout_ms=5000,
+        cache_size=-64000,
+        mmap_size=256 * 1024 * 1024,
+        temp_store="MEMORY",
+        pool_size=8,
+        max_overflow=8,
+        pool_timeout=30,
+    ),
+}
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(value=time.perf_counter() - started)
+
+def build_engine(url: str, profile: EngineProfile):
+    pool_args = {}
+    is_memory = make_url(url).database in (None, "", ":memory:")
+    if not is_memory:
+        pool_args = {"poolclass": InstrumentedQueuePool}
+        pool_args |= {
+            key: value for key, value in {
+                "pool_size": profile.pool_size,
+                "max_overflow": profile.max_overflow,
+                "pool_timeout": profile.pool_timeout,
+            }.items() if value is not None
+        }
+    new_engine = create_async_engine(url, **pool_args)
+
+    pragmas = {key: value for key, value in profile.pragmas().items() if value is not None}
+    if pragmas and new_engine.dialect.name == "sqlite":
+        @event.listens_for(new_engine.sync_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for key, value in pragmas.items():
+                if is_memory and key in ("journal_mode", "mmap_size"):
+                    continue  # Not meaningful for in-memory databases
+                cursor.execute(f"PRAGMA {key}={value}")
+            cursor.close()
+
+    return new_engine
+
+async def describe_engine(target=None) -> dict:
+    """Report the profile in effect, read back from a live connection."""
+    target = target or engine
+    report = {
+        "url": target.url.render_as_string(hide_password=True),
+        "profile": ENGINE_PROFILE.name,
+        "pool": type(target.pool).__name__,
+        "pool_size": ENGINE_PROFILE.pool_size,
+        "max_overflow": ENGINE_PROFILE.max_overflow,
+    }
+    if target.dialect.name == "sqlite":
+        async with target.connect() as conn:
+            for pragma in ENGINE_PROFILE.pragmas():
+                report[pragma] = (await conn.exec_driver_sql(f"PRAGMA {pragma}")).scalar()
+    return report
+
+ENGINE_PROFILE = EngineProfile.from_env()
+engine = build_engine(DATABASE_URL, ENGINE_PROFILE)
+instrument_engine(engine)
 async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 Base = declarative_base()
 
+def _add_missing_columns(conn):
+    # There are no migrations; columns added to a model after its table was
+    # created are appended here. New columns must be nullable or carry a
+    # server_default, as SQLite requires for ADD COLUMN.
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                ddl = CreateColumn(column).compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+
+def _create_missing_indexes(conn):
+    # create_all only builds indexes alongside new tables, so databases created
+    # before an index was declared would never pick it up.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
 async def create_db_and_tables():
     async with engine.begin() as conn:
+        # Columns first: after_create hooks (triggers and their backfills)
+        # may rely on columns an existing table does not have yet
+        await conn.run_sync(_add_missing_columns)
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_indexes)
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -0,0 +1,98 @@
+from sqlalchemy import event, func, select, text
+from database import Base
+from models.grievance import Grievance, Note
+
+# Grievance.note_count, last_note_at and last_activity_at are copies of what
+# the notes table and updated_at say. These triggers keep them in step inside
+# the writing transaction, whichever code path writes: note inserts and
+# deletes (including cascades), bulk imports, and any UPDATE that moves
+# updated_at. last_activity_at is always max(updated_at, last_note_at).
+_ACTIVITY = "max(new.updated_at, coalesce(new.last_note_at, new.updated_at))"
+
+ACTIVITY_TRIGGERS = [
+    # Callers may supply last_activity_at themselves (e.g. generated history)
+    """
+    CREATE TRIGGER IF NOT EXISTS grievance_activity_insert AFTER INSERT ON grievance
+    WHEN new.last_activity_at IS NULL BEGIN
+        UPDATE grievance SET last_activity_at = """ + _ACTIVITY + """ WHERE rowid = new.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS grievance_activity_update AFTER UPDATE OF updated_at ON grievance BEGIN
+        UPDATE grievance SET last_activity_at = """ + _ACTIVITY + """ WHERE rowid = new.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_activity_insert AFTER INSERT ON notes BEGIN
+        UPDATE grievance SET
+            note_count = note_count + 1,
+            last_note_at = max(coalesce(last_note_at, new.created_at), new.created_at),
+            last_activity_at = max(coalesce(last_activity_at, new.created_at), new.created_at)
+        WHERE id = new.grievance_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_activity_delete AFTER DELETE ON notes BEGIN
+        UPDATE grievance SET
+            note_count = note_count - 1,
+            last_note_at = (SELECT max(created_at) FROM notes WHERE grievance_id = old.grievance_id)
+        WHERE id = old.grievance_id;
+        UPDATE grievance SET last_activity_at = max(updated_at, coalesce(last_note_at, updated_at))
+        WHERE id = old.grievance_id;
+    END
+    """,
+]
+
+def _live_note_count():
+    return select(func.count()).where(Note.grievance_id == Grievance.id).scalar_subquery()
+
+def _live_last_note_at():
+    return select(func.max(Note.created_at)).where(Note.grievance_id == Grievance.id).scalar_subquery()
+
+# Plain SQL: a Core UPDATE of grievance would add updated_at's Python
+# onupdate to the SET list, and any SET of updated_at, even to itself,
+# fires grievance_activity_update once more per row
+RECOMPUTE_ACTIVITY = [
+    """
+    UPDATE grievance SET
+        note_count = (SELECT count(*) FROM notes WHERE grievance_id = grievance.id),
+        last_note_at = (SELECT max(created_at) FROM notes WHERE grievance_id = grievance.id)
+    """,
+    "UPDATE grievance SET last_activity_at = max(updated_at, coalesce(last_note_at, updated_at))",
+]
+
+def recompute_activity(conn) -> None:
+    """Rebuild the activity columns of every grievance from its notes, in two set-based UPDATEs."""
+    for statement in RECOMPUTE_ACTIVITY:
+        conn.execute(text(statement))
+
+def check_activity(conn) -> list:
+    """Compare the activity columns with the notes table.
+
+    Returns (id, stored note_count, actual note_count, stored last_note_at,
+    actual last_note_at, stored last_activity_at) for every grievance that
+    differs; an empty list means the columns are consistent.
+    """
+    note_count, last_note_at = _live_note_count(), _live_last_note_at()
+    expected_activity = func.max(Grievance.updated_at, func.coalesce(last_note_at, Grievance.updated_at))
+    query = select(
+        Grievance.id, Grievance.note_count, note_count, Grievance.last_note_at, last_note_at, Grievance.last_activity_at
+    ).where(
+        (Grievance.note_count != note_count)
+        | Grievance.last_note_at.is_distinct_from(last_note_at)
+        | Grievance.last_activity_at.is_distinct_from(expected_activity)
+    )
+    return [tuple(row) for row in conn.execute(query)]
+
+@event.listens_for(Base.metadata, "after_create")
+def create_activity_triggers(target, conn, **kw):
+    if conn.dialect.name != "sqlite":
+        return
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'notes_activity_insert'")
+    ).first()
+    for statement in ACTIVITY_TRIGGERS:
+        conn.execute(text(statement))
+    if not existed:
+        # Rows written before the columns existed hold defaults until recomputed
+        recompute_activity(conn)
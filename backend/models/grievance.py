@@ -1,5 +1,5 @@
 from datetime import datetime, UTC
-from sqlalchemy import String, DateTime, ForeignKey, Column, Enum
+from sqlalchemy import String, DateTime, ForeignKey, Column, Enum, Index, Integer, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 from database import Base
@@ -14,6 +14,12 @@ class GrievanceStatus(enum.Enum):
 
 class Note(Base):
     __tablename__ = "notes"
+    __table_args__ = (
+        # Notes are always fetched per grievance, newest first, and paged by (created_at, id)
+        Index("ix_notes_grievance_created_id", "grievance_id", "created_at", "id"),
+        # Delta sync looks for notes added since a point in time
+        Index("ix_notes_created", "created_at"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     content: Mapped[str] = mapped_column(String)
@@ -27,6 +33,21 @@ class Note(Base):
 
 class Grievance(Base):
     __tablename__ = "grievance"
+    __table_args__ = (
+        # Keyset pagination orders every list by (created_at, id); each index
+        # below ends in those columns so a visibility filter plus page seek
+        # is a single index range.
+        Index("ix_grievance_created", "created_at", "id"),
+        Index("ix_grievance_unit_created", "unit", "created_at", "id"),
+        Index("ix_grievance_user_created", "user_id", "created_at", "id"),
+        # List filters and the updated_at sort
+        Index("ix_grievance_status_created", "status", "created_at", "id"),
+        Index("ix_grievance_type_created", "grievance_type", "grievance_subtype", "created_at", "id"),
+        Index("ix_grievance_updated", "updated_at", "id"),
+        # Delta sync scans a visibility scope's grievances updated since a point in time
+        Index("ix_grievance_unit_updated", "unit", "updated_at", "id"),
+        Index("ix_grievance_user_updated", "user_id", "updated_at", "id"),
+    )
     
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # Personal Information
@@ -51,6 +72,10 @@ class Grievance(Base):
     status: Mapped[GrievanceStatus] = mapped_column(Enum(GrievanceStatus), default=GrievanceStatus.pending)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC))
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+    # Kept in step with the notes and updated_at by triggers (models/activity.py)
+    note_count: Mapped[int] = mapped_column(Integer, default=0, server_default=text("0"))
+    last_note_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_activity_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Foreign key to user
     user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,39 @@
+from datetime import datetime
+import uuid
+from typing import Optional
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+
+class OutboxMessage(Base):
+    """One notification owed to one recipient, read by the outbox worker (core/outbox.py).
+
+    Written in the same transaction as the grievance or note it is about, so
+    a notification exists exactly when the change was committed. Rows are
+    deleted once their digest is sent, or OUTBOX_DEAD_RETENTION_DAYS after
+    they were queued if they were given up on. `available_at` is when the row may
+    next be sent (after the digest window, or after a failed attempt's
+    backoff); it is NULL for rows given up on. `locked_until` is set while a
+    worker holds the row; a worker that dies mid-send lets the lease expire
+    and the row is sent again.
+    """
+    __tablename__ = "outbox"
+    __table_args__ = (
+        # Due rows are sought on this index; depth, lag and dead-letter counts
+        # and the purge of old dead rows are read from it alone
+        Index("ix_outbox_available", "available_at", "created_at"),
+        # A claim takes every pending row of the chosen recipients
+        Index("ix_outbox_recipient", "recipient", "available_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    recipient: Mapped[str] = mapped_column(String(length=320))
+    event_type: Mapped[str] = mapped_column(String(length=50))  # grievance.created or note.created
+    grievance_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True))
+    payload: Mapped[dict] = mapped_column(JSON)  # What the digest line needs, captured at write time
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    available_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
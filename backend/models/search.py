@@ -0,0 +1,87 @@
+from sqlalchemy import column, event, func, literal_column, table, text
+from database import Base
+
+# Full-text index over the free-text grievance fields. It is an FTS5
+# external-content table: the text lives only in `grievance`, the index maps
+# terms to grievance rowids and is kept in sync by the triggers below.
+#
+# Grievance ids are UUIDs, so the rowid is implicit and VACUUM may renumber
+# it; run scripts/rebuild_search_index.py after a VACUUM.
+grievance_fts = table(
+    "grievance_fts",
+    column("rowid"),
+    column("title"),
+    column("description"),
+    column("redress_sought"),
+)
+
+SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS grievance_fts USING fts5(
+        title, description, redress_sought,
+        content='grievance', content_rowid='rowid',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS grievance_fts_insert AFTER INSERT ON grievance BEGIN
+        INSERT INTO grievance_fts(rowid, title, description, redress_sought)
+        VALUES (new.rowid, new.title, new.description, new.redress_sought);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS grievance_fts_delete AFTER DELETE ON grievance BEGIN
+        INSERT INTO grievance_fts(grievance_fts, rowid, title, description, redress_sought)
+        VALUES ('delete', old.rowid, old.title, old.description, old.redress_sought);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS grievance_fts_update AFTER UPDATE OF title, description, redress_sought ON grievance BEGIN
+        INSERT INTO grievance_fts(grievance_fts, rowid, title, description, redress_sought)
+        VALUES ('delete', old.rowid, old.title, old.description, old.redress_sought);
+        INSERT INTO grievance_fts(rowid, title, description, redress_sought)
+        VALUES (new.rowid, new.title, new.description, new.redress_sought);
+    END
+    """,
+]
+
+# bm25 column weights: a hit in the title counts most, then the redress
+# sought, then the (long) description. Lower scores are better matches.
+BM25_WEIGHTS = (10.0, 1.0, 2.0)
+
+def rebuild_search_index(conn) -> None:
+    """Re-read every grievance into the index (existing databases, after VACUUM)."""
+    conn.execute(text("INSERT INTO grievance_fts(grievance_fts) VALUES ('rebuild')"))
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, conn, **kw):
+    if conn.dialect.name != "sqlite":
+        return
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'grievance_fts'")
+    ).first()
+    for statement in SEARCH_DDL:
+        conn.execute(text(statement))
+    if not existed:
+        # Databases created before search existed already hold grievances
+        rebuild_search_index(conn)
+
+def to_match_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must appear, the last
+    one as a prefix so results update while the user is still typing."""
+    terms = ['"' + term.replace('"', "") + '"' for term in q.split()]
+    terms = [term for term in terms if term != '""']
+    if not terms:
+        return ""
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def search_columns():
+    """rank and highlighted snippet expressions for a select over grievance_fts.
+
+    Snippets mark hits with <mark>…</mark> around otherwise unescaped user
+    text; clients must escape before rendering as HTML.
+    """
+    rank = func.bm25(literal_column("grievance_fts"), *BM25_WEIGHTS).label("rank")
+    snippet = func.snippet(literal_column("grievance_fts"), -1, "<mark>", "</mark>", "…", 16).label("snippet")
+    return rank, snippet
@@ -0,0 +1,84 @@
+from sqlalchemy import Integer, String, event, func, select, text
+from sqlalchemy.orm import Mapped, mapped_column
+from database import Base
+from models.grievance import Grievance
+
+class GrievanceStat(Base):
+    """Grievance counts per unit × status × type × creation month.
+
+    Maintained by triggers on `grievance`, so every insert, delete and change
+    of unit, status or type adjusts the matching rows inside the writing
+    transaction, whichever code path performs the write.
+    """
+    __tablename__ = "grievance_stats"
+
+    unit: Mapped[str] = mapped_column(String(length=100), primary_key=True)
+    status: Mapped[str] = mapped_column(String(length=20), primary_key=True)
+    grievance_type: Mapped[str] = mapped_column(String(length=100), primary_key=True)
+    month: Mapped[str] = mapped_column(String(length=7), primary_key=True)  # YYYY-MM
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+# created_at is stored as 'YYYY-MM-DD HH:MM:SS.ffffff'
+_MONTH = "substr({row}.created_at, 1, 7)"
+_ADD = """
+    INSERT INTO grievance_stats (unit, status, grievance_type, month, count)
+    VALUES ({row}.unit, {row}.status, {row}.grievance_type, """ + _MONTH + """, {delta})
+    ON CONFLICT (unit, status, grievance_type, month) DO UPDATE SET count = count + {delta};
+"""
+# Empty groups are removed so reads stay proportional to groups that exist
+_PRUNE = "DELETE FROM grievance_stats WHERE count <= 0;"
+
+STATS_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS grievance_stats_insert AFTER INSERT ON grievance BEGIN"
+    + _ADD.format(row="new", delta=1) + "END",
+    "CREATE TRIGGER IF NOT EXISTS grievance_stats_delete AFTER DELETE ON grievance BEGIN"
+    + _ADD.format(row="old", delta=-1) + _PRUNE + "END",
+    "CREATE TRIGGER IF NOT EXISTS grievance_stats_update AFTER UPDATE OF unit, status, grievance_type, created_at ON grievance BEGIN"
+    + _ADD.format(row="old", delta=-1) + _ADD.format(row="new", delta=1) + _PRUNE + "END",
+]
+
+def _month():
+    return func.substr(Grievance.created_at, 1, 7)
+
+def live_counts_query():
+    """The GROUP BY the summary table stands in for.
+
+    Status is read as the raw stored name, matching what the triggers write.
+    """
+    return select(
+        Grievance.unit, text("grievance.status"), Grievance.grievance_type, _month(), func.count()
+    ).group_by(Grievance.unit, text("grievance.status"), Grievance.grievance_type, _month())
+
+def recompute_stats(conn) -> None:
+    """Rebuild the summary table from the grievance rows."""
+    conn.execute(GrievanceStat.__table__.delete())
+    conn.execute(GrievanceStat.__table__.insert().from_select(
+        ["unit", "status", "grievance_type", "month", "count"], live_counts_query()
+    ))
+
+def check_stats(conn) -> list:
+    """Compare the summary table with a live GROUP BY.
+
+    Returns (unit, status, grievance_type, month, stored, actual) for every
+    group that differs; an empty list means the table is consistent.
+    """
+    stored = {tuple(row[:4]): row[4] for row in conn.execute(select(GrievanceStat.__table__))}
+    actual = {tuple(row[:4]): row[4] for row in conn.execute(live_counts_query())}
+    return [
+        (*key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(stored.keys() | actual.keys())
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+@event.listens_for(Base.metadata, "after_create")
+def create_stats_triggers(target, conn, **kw):
+    if conn.dialect.name != "sqlite":
+        return
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'grievance_stats_insert'")
+    ).first()
+    for statement in STATS_TRIGGERS:
+        conn.execute(text(statement))
+    if not existed:
+        # Grievances written before the triggers existed are not counted yet
+        recompute_stats(conn)
@@ -0,0 +1,74 @@
+from datetime import datetime
+import uuid
+from sqlalchemy import DateTime, Index, String, event, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from fastapi_users_db_sqlalchemy.generics import GUID
+from database import Base
+
+# Tombstones older than this are pruned; a sync token older than this can
+# no longer be served and the client must reload its list
+DELETION_LOG_RETENTION_DAYS = 30
+
+class GrievanceDeletion(Base):
+    """Tombstone for a deleted grievance, read by GET /grievances/changes.
+
+    Written by a trigger on `grievance`, so every delete is logged whichever
+    code path performs it. Owner and unit are kept so tombstones can be
+    filtered by the same visibility rules as the grievances themselves.
+    """
+    __tablename__ = "grievance_deletions"
+    __table_args__ = (
+        Index("ix_grievance_deletions_deleted", "deleted_at", "grievance_id"),
+    )
+
+    grievance_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(GUID)  # Same storage as users.id, which it is compared with
+    unit: Mapped[str] = mapped_column(String(length=100))
+    deleted_at: Mapped[datetime] = mapped_column(DateTime)
+
+# Same 'YYYY-MM-DD HH:MM:SS.ffffff' layout the ORM writes; %f only gives milliseconds
+_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now') || '000'"
+
+DELETION_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS grievance_deletions_log AFTER DELETE ON grievance BEGIN
+    INSERT OR REPLACE INTO grievance_deletions (grievance_id, user_id, unit, deleted_at)
+    VALUES (old.id, old.user_id, old.unit, {_NOW});
+    DELETE FROM grievance_deletions
+    WHERE deleted_at < strftime('%Y-%m-%d %H:%M:%f', 'now', '-{DELETION_LOG_RETENTION_DAYS} days');
+END
+"""
+
+class GrievanceScopeExit(Base):
+    """Tombstone for a grievance that moved away from an owner or unit, read by GET /grievances/changes.
+
+    Written by a trigger when a grievance's unit or owner changes, with the
+    values it had before; callers who could see it through those and no
+    longer can get it as deleted. One row per grievance and former owner
+    and unit, refreshed if it leaves them again.
+    """
+    __tablename__ = "grievance_scope_exits"
+    __table_args__ = (
+        Index("ix_grievance_scope_exits_exited", "exited_at", "grievance_id"),
+    )
+
+    grievance_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(GUID, primary_key=True)
+    unit: Mapped[str] = mapped_column(String(length=100), primary_key=True)
+    exited_at: Mapped[datetime] = mapped_column(DateTime)
+
+SCOPE_EXIT_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS grievance_scope_exits_log AFTER UPDATE OF unit, user_id ON grievance
+WHEN old.unit IS NOT new.unit OR old.user_id IS NOT new.user_id BEGIN
+    INSERT OR REPLACE INTO grievance_scope_exits (grievance_id, user_id, unit, exited_at)
+    VALUES (old.id, old.user_id, old.unit, {_NOW});
+    DELETE FROM grievance_scope_exits
+    WHERE exited_at < strftime('%Y-%m-%d %H:%M:%f', 'now', '-{DELETION_LOG_RETENTION_DAYS} days');
+END
+"""
+
+@event.listens_for(Base.metadata, "after_create")
+def create_deletion_trigger(target, conn, **kw):
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(DELETION_TRIGGER))
+        conn.execute(text(SCOPE_EXIT_TRIGGER))
@@ -1,5 +1,5 @@
 from typing import Optional, List
-from sqlalchemy import Column, String, Enum
+from sqlalchemy import Column, String, Enum, Integer
 import uuid
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
 from fastapi_users import schemas
@@ -24,6 +24,9 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     position: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     phone: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.user)
+    # Bumped whenever role, unit or active state changes so that claims-mode
+    # tokens issued before the change stop being accepted
+    token_generation: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     grievances: Mapped[List["Grievance"]] = relationship("Grievance", back_populates="user")
 
     def to_dict(self):
@@ -1,17 +1,40 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import List
 import uuid
 from models.user import User, UserRead, UserCreate, UserUpdate, UserRole
 from auth.users import fastapi_users, current_user
-from auth.auth import auth_backend
+from auth.auth import auth_backend, token_generations
 from auth.dependencies import get_user_admin, get_user_supervisor
 from database import get_async_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+logger = logging.getLogger(__name__)
+
 auth_router = APIRouter(tags=["auth"])
 users_router = APIRouter(tags=["users"])
 
+# Changes to these fields alter what a claims-mode token authorizes
+TOKEN_CLAIM_FIELDS = ("role", "unit", "is_active")
+
+def _claim_value(value):
+    # The payload's role is the schema's enum and the stored one the model's,
+    # which never compare equal to each other; compare their values
+    return getattr(value, "value", value)
+
+def revoke_tokens_if_claims_changed(user: User, update_data: dict) -> None:
+    """Bump the user's token generation if the update changes a signed claim.
+
+    Resending a claim with its current value, as clients that PATCH the
+    whole profile do, leaves the user's tokens valid.
+    """
+    if any(
+        field in update_data and _claim_value(update_data[field]) != _claim_value(getattr(user, field))
+        for field in TOKEN_CLAIM_FIELDS
+    ):
+        user.token_generation = (user.token_generation or 0) + 1
+
 # Add our custom endpoints first
 @users_router.get("/all", response_model=List[UserRead])
 async def get_all_users(
@@ -45,11 +68,13 @@ async def update_own_profile(
     if "role" in update_data:
         del update_data["role"]  # Users cannot change their own role
     
+    revoke_tokens_if_claims_changed(user_to_update, update_data)
     for field, value in update_data.items():
         setattr(user_to_update, field, value)
     
     await db.commit()
     await db.refresh(user_to_update)
+    token_generations.set(user_to_update.id, user_to_update.token_generation)
     
     return user_to_update
 
@@ -61,15 +86,12 @@ async def update_user(
     db: AsyncSession = Depends(get_async_session)
 ):
     """Update any user. Only accessible by admins."""
-    print(f"Update user request - User ID: {user_id}, Current user role: {current_user.role}")
-    print(f"Update data: {user_update.model_dump()}")
-    
     # Get the user to update
     result = await db.execute(select(User).where(User.id == user_id))
     user_to_update = result.scalar_one_or_none()
     
     if not user_to_update:
-        print(f"User {user_id} not found")
+        logger.info("Update requested for unknown user %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -77,30 +99,32 @@ async def update_user(
     
     # Update fields
     update_data = user_update.model_dump(exclude_unset=True)
-    print(f"Processed update data: {update_data}")
+    # Field names only: the values include contact details and passwords
+    logger.debug("Admin %s updating user %s fields %s", current_user.id, user_id, sorted(update_data))
     
     # Special handling for role updates
     if "role" in update_data:
         new_role = update_data["role"]
-        print(f"Role update requested: {new_role}")
         # Validate role value
         if new_role not in ["user", "supervisor", "admin"]:
-            print(f"Invalid role value: {new_role}")
+            logger.info("Rejected invalid role %r for user %s", new_role, user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid role"
             )
     
+    revoke_tokens_if_claims_changed(user_to_update, update_data)
     for field, value in update_data.items():
         setattr(user_to_update, field, value)
     
     try:
         await db.commit()
         await db.refresh(user_to_update)
-        print(f"User {user_id} updated successfully with new role: {user_to_update.role}")
+        token_generations.set(user_to_update.id, user_to_update.token_generation)
+        logger.info("User %s updated by admin %s (role %s)", user_id, current_user.id, user_to_update.role.value)
         return user_to_update
     except Exception as e:
-        print(f"Error updating user: {str(e)}")
+        logger.exception("Error updating user %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
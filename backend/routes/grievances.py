@@ -1,18 +1,441 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, func, literal, literal_column, or_, select, text, tuple_, union_all, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
 import uuid
-from database import get_async_session
-from models.grievance import Grievance, Note
+from database import async_session_maker, get_async_session
+from models.grievance import Grievance, GrievanceStatus, Note
+from models import activity  # noqa: F401  (triggers maintaining the list activity columns)
+from models.stats import GrievanceStat
+from models.sync import DELETION_LOG_RETENTION_DAYS, GrievanceDeletion, GrievanceScopeExit
+from models.search import grievance_fts, search_columns, to_match_query
 from models.user import User, UserRole
-from schemas.grievance import GrievanceCreate, GrievanceRead, GrievanceUpdate, NoteCreate, NoteRead
-from auth.users import current_user
-from auth.dependencies import get_user_supervisor
-from datetime import datetime
+from schemas.grievance import (
+    GrievanceCreate, GrievanceRead, GrievanceListRow, GrievanceUpdate, GrievanceFilters, GrievancePage, GrievanceSearchHit, GrievanceSearchPage,
+    GrievanceSummary, GrievanceFieldsPage, GrievanceChanges, GrievanceTombstone, GrievanceDetail,
+    GrievanceSort, GrievanceStatRead, GrievanceImportResult,
+    GrievanceBulkStatus, GrievanceBulkStatusItem, GrievanceBulkStatusResult, BulkStatusOutcome,
+    NoteCreate, NoteRead, NotePage,
+)
+from auth.users import current_user, current_reader
+from auth.dependencies import get_user_admin, get_user_supervisor
+from core.cache import cache_key, cached_response, response_cache, serialize
+from core.etag import etag_matches, make_etag, not_modified
+from core.events import event_hub, event_stream
+from core.exporter import EXPORT_CHUNK_SIZE, ExportFormat, ExportWriter
+from core.importer import IMPORT_BATCH_SIZE, ImportFormat, import_grievances, iter_records
+from core.querystats import allow_repeated_queries
+from core.loaders import UserLoader, get_user_loader
+from core.outbox import enqueue_notifications
+from core.pagination import keyset_page, keyset_union_page, split_page
+from core.sync import CHANGES_OVERLAP_SECONDS, SyncToken, decode_sync_token, encode_sync_token
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/grievances", tags=["grievances"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Newest notes embedded in a grievance's detail; older ones are paged through GET /{id}/notes
+DETAIL_NOTE_LIMIT = 20
+
+def grievance_to_read(grievance: Grievance, notes: Optional[List[NoteRead]] = None, model=GrievanceRead, **extra) -> GrievanceRead:
+    """Build a GrievanceRead (or `model`, given its `extra` fields) without touching the lazy `notes` relationship."""
+    return model(
+        id=grievance.id,
+        title=grievance.title,
+        description=grievance.description,
+        redress_sought=grievance.redress_sought,
+        status=grievance.status,
+        submitter_name=grievance.submitter_name,
+        service_number=grievance.service_number,
+        rank=grievance.rank,
+        email=grievance.email,
+        phone=grievance.phone,
+        unit=grievance.unit,
+        position=grievance.position,
+        grievance_type=grievance.grievance_type,
+        grievance_subtype=grievance.grievance_subtype,
+        created_at=grievance.created_at,
+        user_id=grievance.user_id,
+        note_count=grievance.note_count,
+        last_note_at=grievance.last_note_at,
+        last_activity_at=grievance.last_activity_at,
+        notes=notes or [],
+        **extra
+    )
+
+def visibility_filter(user: User, model=Grievance):
+    """WHERE clause limiting grievances to those `user` may see, or None for admins.
+
+    `model` may be any table with the grievance's user_id and unit, such as
+    the deletion log.
+    """
+    if user.role == UserRole.admin:
+        # Admins can see all grievances
+        return None
+    if user.role == UserRole.supervisor:
+        # Supervisors can see their own grievances and grievances from their unit
+        return (model.user_id == user.id) | (model.unit == user.unit)
+    # Regular users can only see their own grievances
+    return model.user_id == user.id
+
+def visible_grievances_query(user: User):
+    query = select(Grievance)
+    clause = visibility_filter(user)
+    if clause is not None:
+        query = query.where(clause)
+    return query
+
+def visible_list_queries(user: User) -> list:
+    """The grievances `user` may see, as disjoint queries for keyset_union_page.
+
+    A supervisor's unit and their own grievances elsewhere are separate
+    branches, each walking its own index in list order; ORed together, every
+    page would sort the whole visible set.
+    """
+    if user.role == UserRole.supervisor and user.unit is not None:
+        return [
+            select(Grievance).where(Grievance.unit == user.unit),
+            select(Grievance).where(Grievance.user_id == user.id, Grievance.unit != user.unit),
+        ]
+    return [visible_grievances_query(user)]
+
+def combine_queries(queries: list):
+    """One select over the union of list branches, for reads that are not paged."""
+    if len(queries) == 1:
+        return queries[0]
+    return select(Grievance).where(or_(*(query.whereclause for query in queries)))
+
+def _as_stored_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC; an aware bound must be converted
+    # first or its offset would silently be dropped.
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def grievance_filters(
+    status: Optional[List[GrievanceStatus]] = Query(None, description="Repeat to match any of several statuses"),
+    grievance_type: Optional[str] = None,
+    grievance_subtype: Optional[str] = None,
+    unit: Optional[str] = None,
+    created_from: Optional[datetime] = Query(None, description="Inclusive lower bound on created_at"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive upper bound on created_at"),
+    sort: GrievanceSort = GrievanceSort.created_at,
+) -> GrievanceFilters:
+    return GrievanceFilters(
+        status=status,
+        grievance_type=grievance_type,
+        grievance_subtype=grievance_subtype,
+        unit=unit,
+        created_from=created_from,
+        created_to=created_to,
+        sort=sort,
+    )
+
+def filter_grievances(query, filters: GrievanceFilters):
+    """Compile list filters into WHERE clauses on top of an existing query."""
+    if filters.status:
+        query = query.where(Grievance.status.in_(filters.status))
+    if filters.grievance_type is not None:
+        query = query.where(Grievance.grievance_type == filters.grievance_type)
+    if filters.grievance_subtype is not None:
+        query = query.where(Grievance.grievance_subtype == filters.grievance_subtype)
+    if filters.unit is not None:
+        query = query.where(Grievance.unit == filters.unit)
+    if filters.created_from is not None:
+        query = query.where(Grievance.created_at >= _as_stored_utc(filters.created_from))
+    if filters.created_to is not None:
+        query = query.where(Grievance.created_at < _as_stored_utc(filters.created_to))
+    return query
+
+def search_grievances_query(user: User, match: str):
+    score, snippet = search_columns()
+    query = (
+        select(Grievance, score, snippet)
+        .select_from(grievance_fts)
+        .join(Grievance, literal_column("grievance.rowid") == grievance_fts.c.rowid)
+        .where(text("grievance_fts MATCH :match").bindparams(match=match))
+    )
+    clause = visibility_filter(user)
+    if clause is not None:
+        query = query.where(clause)
+    return query.order_by(score, Grievance.id)
+
+def stats_query(user: User, unit: Optional[str] = None, month_from: Optional[str] = None, month_to: Optional[str] = None):
+    """Grievance counts over the grievances `user` may see, by the visibility_filter rule.
+
+    Admins and a supervisor's own unit read the summary table. A supervisor's
+    own grievances in other units share their summary rows with everyone
+    else's there, so they are counted live; those are few, and the unit
+    condition keeps the two parts disjoint.
+    """
+    month = func.substr(Grievance.created_at, 1, 7)  # Same bucketing as the grievance_stats triggers
+    summary = select(GrievanceStat.unit, GrievanceStat.status, GrievanceStat.grievance_type, GrievanceStat.month, GrievanceStat.count)
+    own = select(Grievance.unit, Grievance.status, Grievance.grievance_type, month.label("month"), func.count().label("count"))
+    own = own.where(Grievance.user_id == user.id, Grievance.unit != user.unit)
+    if unit is not None:
+        summary = summary.where(GrievanceStat.unit == unit)
+        own = own.where(Grievance.unit == unit)
+    if month_from is not None:
+        summary = summary.where(GrievanceStat.month >= month_from)
+        own = own.where(month >= month_from)
+    if month_to is not None:
+        summary = summary.where(GrievanceStat.month <= month_to)
+        own = own.where(month <= month_to)
+    if user.role != UserRole.supervisor:
+        return summary.order_by(GrievanceStat.unit, GrievanceStat.month, GrievanceStat.status, GrievanceStat.grievance_type)
+    summary = summary.where(GrievanceStat.unit == user.unit)
+    own = own.group_by(Grievance.unit, Grievance.status, Grievance.grievance_type, month)
+    # unit, month, status, grievance_type by result position, as in keyset_union_page
+    return union_all(summary, own).order_by(*(literal_column(str(position)) for position in (1, 4, 2, 3)))
+
+def export_query(user: User, filters: GrievanceFilters):
+    query = filter_grievances(visible_grievances_query(user), filters)
+    sort_column = getattr(Grievance, filters.sort.field)
+    if filters.sort.descending:
+        query = query.order_by(sort_column.desc(), Grievance.id.desc())
+    else:
+        query = query.order_by(sort_column, Grievance.id)
+    return query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+async def export_chunks(query, writer: ExportWriter):
+    """Stream an export chunk by chunk from a server-side cursor."""
+    # The request's own session is closed before the body is sent, so the
+    # stream opens its own
+    async with async_session_maker() as session:
+        yield writer.header()
+        result = await session.stream(query)
+        async for grievances in result.scalars().partitions():
+            notes, notes_by_grievance = [], {}
+            if writer.include_notes:
+                ids = [grievance.id for grievance in grievances]
+                notes = (await session.execute(
+                    select(Note).where(Note.grievance_id.in_(ids)).order_by(Note.created_at.desc())
+                )).scalars().all()
+                for note in await notes_to_read(notes, UserLoader(session)):
+                    notes_by_grievance.setdefault(note.grievance_id, []).append(note)
+            yield writer.chunk(
+                grievance_to_read(grievance, notes_by_grievance.get(grievance.id)) for grievance in grievances
+            )
+            # Drop the chunk from the identity map so memory stays flat
+            for instance in (*grievances, *notes):
+                session.expunge(instance)
+
+def changes_query(user: User, since: Optional[datetime], after: Optional[Tuple[datetime, uuid.UUID]], limit: int):
+    """One page of grievances changed at or after `since`, oldest change first.
+
+    A grievance changes when its row is updated, a note is added to it or it
+    is deleted; its change time is the latest of those. One moved to a unit
+    or owner the caller cannot see counts as deleted. Each source is read
+    through an index on its timestamp, so a page costs what the changes
+    since `since` cost, not what the tables hold. Rows are (id, changed_at,
+    deleted), one extra row is fetched to tell whether more are waiting.
+    """
+    updated = select(Grievance.id.label("id"), Grievance.updated_at.label("changed_at"), literal(0).label("deleted"))
+    noted = select(Note.grievance_id, Note.created_at, literal(0))
+    deleted = select(GrievanceDeletion.grievance_id, GrievanceDeletion.deleted_at, literal(1))
+    if since is not None:
+        updated = updated.where(Grievance.updated_at >= since)
+        noted = noted.where(Note.created_at >= since)
+        deleted = deleted.where(GrievanceDeletion.deleted_at >= since)
+    exited = None
+    clause = visibility_filter(user)
+    if clause is not None:
+        updated = updated.where(clause)
+        # A correlated EXISTS keeps SQLite driving from the new notes; as a
+        # join it would walk every grievance in scope looking for them
+        noted = noted.where(exists().where(Grievance.id == Note.grievance_id, clause))
+        deleted = deleted.where(visibility_filter(user, GrievanceDeletion))
+        # Only callers short of admin can lose sight of a grievance that
+        # moves: those who saw it where it was and cannot where it is now
+        exited = select(GrievanceScopeExit.grievance_id, GrievanceScopeExit.exited_at, literal(1)).where(
+            visibility_filter(user, GrievanceScopeExit),
+            ~exists().where(Grievance.id == GrievanceScopeExit.grievance_id, clause),
+        )
+        if since is not None:
+            exited = exited.where(GrievanceScopeExit.exited_at >= since)
+    sources = [updated, noted, deleted] if exited is None else [updated, noted, deleted, exited]
+    changes = union_all(*sources).subquery()
+    latest = select(
+        changes.c.id, func.max(changes.c.changed_at).label("changed_at"), func.max(changes.c.deleted).label("deleted")
+    ).group_by(changes.c.id).subquery()
+    query = select(latest)
+    if after is not None:
+        query = query.where(tuple_(latest.c.changed_at, latest.c.id) > tuple_(*after))
+    return query.order_by(latest.c.changed_at, latest.c.id).limit(limit + 1)
+
+def user_grievances_query(user_id: uuid.UUID):
+    return select(Grievance).where(Grievance.user_id == user_id)
+
+def notes_query(grievance_id: uuid.UUID):
+    return select(Note).where(Note.grievance_id == grievance_id).order_by(Note.created_at.desc(), Note.id.desc())
+
+def notes_page_query(grievance_id: uuid.UUID, cursor: Optional[str], limit: int):
+    """One page of a grievance's notes, newest first."""
+    return keyset_page(select(Note).where(Note.grievance_id == grievance_id), Note, cursor, limit, descending=True)
+
+async def notes_to_read(notes: List[Note], loader: UserLoader) -> List[NoteRead]:
+    """Build NoteRead objects, resolving all author names in one batched lookup."""
+    names = await loader.load_names(note.user_id for note in notes)
+    return [
+        NoteRead(
+            id=note.id,
+            content=note.content,
+            created_at=note.created_at,
+            user_id=note.user_id,
+            grievance_id=note.grievance_id,
+            user_name=names.get(note.user_id, "Unknown user")
+        )
+        for note in notes
+    ]
+
+def list_version_query(queries: list, filters: GrievanceFilters, paginate: bool, cursor: Optional[str], limit: int):
+    """Aggregate over exactly the rows a list response covers.
+
+    An insert or delete in that window changes the count or the rowid sum,
+    any update or new note moves max(last_activity_at) forward, and a
+    deleted note changes the note count. Owner names are not covered; a
+    renamed owner shows up once the rows change or the cache entry expires.
+    """
+    columns = (
+        literal_column("grievance.rowid").label("row"), Grievance.last_activity_at, Grievance.note_count,
+        # Ordering a union of branches needs the keyset columns in its results
+        *dict.fromkeys([getattr(Grievance, filters.sort.field), Grievance.id]),
+    )
+    if paginate:
+        window = keyset_union_page(
+            [filter_grievances(query, filters).with_only_columns(*columns) for query in queries],
+            Grievance, cursor, limit, filters.sort.field, filters.sort.descending
+        )
+    else:
+        window = filter_grievances(combine_queries(queries), filters).with_only_columns(*columns)
+    window = window.subquery()
+    return select(
+        func.count(), func.max(window.c.last_activity_at), func.total(window.c.row), func.total(window.c.note_count)
+    )
+
+async def list_etag(
+    session: AsyncSession, queries: list, filters: GrievanceFilters, paginate: bool, cursor: Optional[str], limit: int, scope: str
+) -> str:
+    version = (await session.execute(list_version_query(queries, filters, paginate, cursor, limit))).one()
+    return make_etag(scope, *version)
+
+async def list_cache_scope(session: AsyncSession, user: User) -> Tuple[str, Set[str], list]:
+    """Cache scope of a user's grievance list, the tags that invalidate it and the queries producing it.
+
+    A supervisor whose own grievances all sit in their unit sees exactly that
+    unit's grievances, so those supervisors share one scope.
+    """
+    if user.role == UserRole.admin:
+        return "all", {"grievances:all"}, [select(Grievance)]
+    if user.role == UserRole.supervisor and user.unit is not None:
+        outside = await session.scalar(select(exists().where(Grievance.user_id == user.id, Grievance.unit != user.unit)))
+        if not outside:
+            return f"unit:{user.unit}", {f"grievances:unit:{user.unit}"}, [select(Grievance).where(Grievance.unit == user.unit)]
+        return f"supervisor:{user.id}", {f"grievances:unit:{user.unit}", f"grievances:user:{user.id}"}, visible_list_queries(user)
+    return f"user:{user.id}", {f"grievances:user:{user.id}"}, visible_list_queries(user)
+
+def grievance_tags(grievance_id: uuid.UUID, user_id: uuid.UUID, *units: str) -> Set[str]:
+    """Cache tags touched by a write to one grievance (pass both units when the unit changes)."""
+    return {
+        "grievances:all",
+        f"grievances:user:{user_id}",
+        f"grievance:{grievance_id}",
+        *(f"grievances:unit:{unit}" for unit in units),
+    }
+
+def publish_grievance_event(event_type: str, grievance: Grievance, *units: str) -> None:
+    """Tell event stream subscribers about a committed change (pass both units when the unit changes)."""
+    # The owner's name is not loaded here; subscribers already have it from the list
+    data = {name: getattr(grievance, name) for name in SUMMARY_FIELDS if name != "owner_name"}
+    event_hub.publish(event_type, grievance.id, grievance.user_id, units or (grievance.unit,), data)
+
+def grievance_version_query(grievance_id: uuid.UUID):
+    """Owner, unit and everything a detail response's ETag depends on, without loading the row or its notes."""
+    return select(
+        Grievance.user_id, Grievance.unit, Grievance.updated_at, Grievance.note_count, Grievance.last_note_at
+    ).where(Grievance.id == grievance_id)
+
+def sync_scope(user: User) -> Tuple[str, Optional[str]]:
+    """What visibility_filter reads from `user` besides its id."""
+    return (user.role.value, user.unit if user.role == UserRole.supervisor else None)
+
+def can_view(user: User, owner_id: uuid.UUID, unit: str) -> bool:
+    if user.role == UserRole.admin:
+        return True
+    if user.role == UserRole.supervisor and unit == user.unit:
+        return True
+    return owner_id == user.id
+
+SUMMARY_FIELDS = list(GrievanceSummary.model_fields)
+# Every column a list can be narrowed to with ?fields=
+LIST_FIELDS = [*(name for name in GrievanceRead.model_fields if name != "notes"), "updated_at", "owner_name"]
+# Resolved by joining the owner's user row into the list query itself
+OWNER_NAME = func.coalesce(User.name, User.email).label("owner_name")
+
+def with_list_columns(query, fields: List[str]):
+    """Narrow a grievance select to `fields`, joining the owner only when owner_name is asked for."""
+    query = query.with_only_columns(*(OWNER_NAME if name == "owner_name" else getattr(Grievance, name) for name in fields))
+    if "owner_name" in fields:
+        query = query.join(User, User.id == Grievance.user_id)
+    return query
+
+def list_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. title,status,created_at. id is always included."),
+) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *requested]))
+
+async def list_grievances(
+    session: AsyncSession, queries: list, filters: GrievanceFilters, paginate: bool, cursor: Optional[str], limit: int,
+    fields: Optional[List[str]] = None,
+):
+    """Run a filtered grievance list either as one keyset page or, if opted out, in full.
+
+    `queries` are the disjoint branches of the list (see visible_list_queries).
+    Pages hold GrievanceSummary rows, or just `fields` when given; either way
+    only those columns are selected. The unpaginated list keeps returning
+    full grievances unless `fields` is given.
+    """
+    sort_field, descending = filters.sort.field, filters.sort.descending
+    # The sort column is selected too so the next cursor can be built from the last row
+    columns = list(dict.fromkeys([*(fields or SUMMARY_FIELDS), sort_field]))
+    if paginate:
+        page = keyset_union_page(
+            [with_list_columns(filter_grievances(query, filters), columns) for query in queries],
+            Grievance, cursor, limit, sort_field, descending
+        )
+        rows, next_cursor = split_page((await session.execute(page)).all(), limit, sort_field)
+        if fields is None:
+            return GrievancePage(
+                items=[GrievanceSummary(**row._mapping) for row in rows],
+                next_cursor=next_cursor
+            )
+        return GrievanceFieldsPage(
+            items=[{name: row._mapping[name] for name in fields} for row in rows],
+            next_cursor=next_cursor
+        )
+
+    query = filter_grievances(combine_queries(queries), filters)
+    sort_column = getattr(Grievance, sort_field)
+    order = sort_column.desc() if descending else sort_column
+    if fields is None:
+        query = query.add_columns(OWNER_NAME).join(User, User.id == Grievance.user_id)
+        result = await session.execute(query.order_by(order))
+        return [grievance_to_read(grievance, model=GrievanceListRow, owner_name=owner_name) for grievance, owner_name in result]
+
+    rows = (await session.execute(with_list_columns(query, columns).order_by(order))).all()
+    return [{name: row._mapping[name] for name in fields} for row in rows]
+
 @router.post("", response_model=GrievanceRead)
 async def create_grievance(
     grievance: GrievanceCreate,
@@ -24,86 +447,291 @@ async def create_grievance(
         user_id=current_user.id
     )
     session.add(db_grievance)
+    await session.flush()
+    # Emails go out through the outbox, committed together with the grievance
+    await enqueue_notifications(session, "grievance.created", db_grievance)
     await session.commit()
     await session.refresh(db_grievance)
+    response_cache.invalidate(grievance_tags(db_grievance.id, db_grievance.user_id, db_grievance.unit))
+    publish_grievance_event("grievance.created", db_grievance)
     
     # Create a response object without notes
-    response = GrievanceRead(
-        id=db_grievance.id,
-        title=db_grievance.title,
-        description=db_grievance.description,
-        redress_sought=db_grievance.redress_sought,
-        status=db_grievance.status,
-        submitter_name=db_grievance.submitter_name,
-        service_number=db_grievance.service_number,
-        rank=db_grievance.rank,
-        email=db_grievance.email,
-        phone=db_grievance.phone,
-        unit=db_grievance.unit,
-        position=db_grievance.position,
-        grievance_type=db_grievance.grievance_type,
-        grievance_subtype=db_grievance.grievance_subtype,
-        created_at=db_grievance.created_at,
-        user_id=db_grievance.user_id,
-        notes=[]  # New grievance has no notes
-    )
+    response = grievance_to_read(db_grievance)
     return response
 
-@router.get("", response_model=list[GrievanceRead])
+@router.post("/import", response_model=GrievanceImportResult)
+async def bulk_import_grievances(
+    request: Request,
+    format: Optional[ImportFormat] = Query(None, description="Defaults to the request Content-Type (text/csv or application/x-ndjson)"),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000),
+    current_user: User = Depends(get_user_admin),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Import grievances from a CSV or NDJSON request body, streamed and inserted in batches.
+
+    Rows are validated like POST /grievances and owned by the importing admin.
+    Invalid rows are listed by line number; valid rows are kept either way.
+    """
+    if format is None:
+        try:
+            format = ImportFormat.from_content_type(request.headers.get("content-type", ""))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(e))
+    # One INSERT per batch is the point here, not an N+1
+    allow_repeated_queries()
+    records = iter_records(request.stream(), format)
+    return await import_grievances(session, records, current_user.id, batch_size)
+
+@router.post("/bulk-status", response_model=GrievanceBulkStatusResult)
+async def bulk_update_status(
+    bulk: GrievanceBulkStatus,
+    current_user: User = Depends(get_user_supervisor),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Move many grievances to one status in a single transaction.
+
+    The same rules as PUT /{id} apply, but as part of one UPDATE over every
+    id instead of a load and commit per grievance. Each distinct id gets an
+    outcome: updated, unchanged (already in that status), forbidden or
+    not_found.
+    """
+    ids = list(dict.fromkeys(bulk.ids))
+    update_query = (
+        update(Grievance)
+        .where(Grievance.id.in_(ids), Grievance.status != bulk.status)
+        # updated_at moves so ETags, sync watermarks and the activity trigger see the change
+        .values(status=bulk.status, updated_at=datetime.now(timezone.utc))
+        .returning(Grievance.id)
+        .execution_options(synchronize_session=False)
+    )
+    clause = visibility_filter(current_user)
+    if clause is not None:
+        update_query = update_query.where(clause)
+    updated_ids = set((await session.execute(update_query)).scalars().all())
+
+    # Read back in the same transaction: summaries for the events, and owner
+    # and unit to tell the ids that were skipped apart
+    result = await session.execute(
+        with_list_columns(select(Grievance), SUMMARY_FIELDS).where(Grievance.id.in_(ids))
+    )
+    rows = {row.id: row for row in result}
+    await session.commit()
+
+    results = []
+    for grievance_id in ids:
+        row = rows.get(grievance_id)
+        if grievance_id in updated_ids:
+            outcome = BulkStatusOutcome.updated
+        elif row is None:
+            outcome = BulkStatusOutcome.not_found
+        elif not can_view(current_user, row.user_id, row.unit):
+            outcome = BulkStatusOutcome.forbidden
+        else:
+            outcome = BulkStatusOutcome.unchanged
+        results.append(GrievanceBulkStatusItem(id=grievance_id, outcome=outcome))
+
+    updated_rows = [rows[grievance_id] for grievance_id in ids if grievance_id in updated_ids]
+    if updated_rows:
+        response_cache.invalidate(set().union(*(grievance_tags(row.id, row.user_id, row.unit) for row in updated_rows)))
+    for row in updated_rows:
+        publish_grievance_event("grievance.updated", row)
+    return GrievanceBulkStatusResult(updated=len(updated_ids), results=results)
+
+@router.get("", response_model=Union[GrievancePage, GrievanceFieldsPage, List[GrievanceListRow], List[Dict[str, Any]]])
 async def read_grievances(
-    current_user: User = Depends(current_user),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    paginate: bool = Query(True, description="Set to false to return every visible grievance as a plain list"),
+    filters: GrievanceFilters = Depends(grievance_filters),
+    fields: Optional[List[str]] = Depends(list_fields),
+    current_user: User = Depends(current_reader),
     session: AsyncSession = Depends(get_async_session),
 ):
-    query = select(Grievance)
-    
-    if current_user.role == UserRole.admin:
-        # Admins can see all grievances
-        print("DEBUG: User is admin, no filters applied")
-        pass
-    elif current_user.role == UserRole.supervisor:
-        # Supervisors can see their own grievances and grievances from their unit
-        print(f"DEBUG: User is supervisor, filtering by unit {current_user.unit}")
-        query = query.where((Grievance.user_id == current_user.id) | 
-                          (Grievance.unit == current_user.unit))
+    logger.debug("Listing grievances for %s user %s", current_user.role.value, current_user.id)
+    # Taken before any read so a write landing mid-request keeps this response out of the cache
+    generation = response_cache.generation
+    scope, tags, queries = await list_cache_scope(session, current_user)
+    key = cache_key("grievances", scope, request)
+    entry = response_cache.get(key)
+    if entry is None:
+        etag = await list_etag(session, queries, filters, paginate, cursor, limit, scope)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        content = await list_grievances(session, queries, filters, paginate, cursor, limit, fields)
+        entry = response_cache.set(key, serialize(content), etag, tags, generation)
+    return cached_response(entry, request)
+
+@router.get("/search", response_model=GrievanceSearchPage)
+async def search_grievances(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in title, description or redress sought"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(current_reader),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Full-text search over the grievances the caller can see, best matches first."""
+    match = to_match_query(q)
+    if not match:
+        return GrievanceSearchPage(items=[])
+
+    query = search_grievances_query(current_user, match).offset(offset).limit(limit + 1)
+    rows = (await session.execute(query)).all()
+    items = [
+        GrievanceSearchHit(**grievance_to_read(grievance).model_dump(), score=score, snippet=snippet)
+        for grievance, score, snippet in rows[:limit]
+    ]
+    return GrievanceSearchPage(
+        items=items,
+        next_offset=offset + limit if len(rows) > limit else None
+    )
+
+@router.get("/stats", response_model=List[GrievanceStatRead])
+async def read_grievance_stats(
+    unit: Optional[str] = None,
+    month_from: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Inclusive, YYYY-MM"),
+    month_to: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Inclusive, YYYY-MM"),
+    current_user: User = Depends(current_reader),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Grievance counts by unit, status, type and creation month, over the grievances the caller can see."""
+    if current_user.role not in (UserRole.admin, UserRole.supervisor):
+        raise HTTPException(status_code=403, detail="Not authorized to view grievance statistics")
+    result = await session.execute(stats_query(current_user, unit, month_from, month_to))
+    return [
+        GrievanceStatRead(
+            unit=stat.unit,
+            status=GrievanceStatus[stat.status],
+            grievance_type=stat.grievance_type,
+            month=stat.month,
+            count=stat.count
+        )
+        for stat in result.all()
+    ]
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_grievances(
+    format: ExportFormat = ExportFormat.ndjson,
+    include_notes: bool = False,
+    filters: GrievanceFilters = Depends(grievance_filters),
+    current_user: User = Depends(current_reader),
+):
+    """Stream every grievance the caller can see as NDJSON or CSV, optionally with notes."""
+    logger.info("Exporting grievances for %s user %s", current_user.role.value, current_user.id)
+    # The export runs a fixed set of queries per chunk by design
+    allow_repeated_queries()
+    return StreamingResponse(
+        export_chunks(export_query(current_user, filters), ExportWriter(format, include_notes)),
+        media_type=format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="grievances.{format.value}"'}
+    )
+
+@router.get("/changes", response_model=GrievanceChanges)
+async def read_grievance_changes(
+    since: Optional[str] = Query(None, description="next_token from the previous call; omit to sync from scratch"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(current_reader),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Grievances created, updated or given notes since `since`, and tombstones for ones deleted or moved out of view.
+
+    Keep calling with next_token while has_more is true; once caught up, the
+    next_token is the one to use on the next sync.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    token = decode_sync_token(since) if since else None
+    if token is not None and token.watermark < now - timedelta(days=DELETION_LOG_RETENTION_DAYS):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Sync token expired; reload all grievances")
+    scope = sync_scope(current_user)
+    if token is not None and token.scope is not None and token.scope != scope:
+        # A new role or unit changes which grievances are visible at all,
+        # which no per-grievance tombstone records
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Access changed since the last sync; reload all grievances")
+
+    if token is None:
+        start, after = None, None
+    elif token.after is None:
+        start, after = token.watermark, None
     else:
-        # Regular users can only see their own grievances
-        print("DEBUG: User is regular user, filtering by user_id")
-        query = query.where(Grievance.user_id == current_user.id)
-    
-    result = await session.execute(query)
-    grievances = result.scalars().all()
-    print(f"DEBUG: Found {len(grievances)} grievances")
-    
-    # Create response objects with empty notes arrays
-    response = []
-    for grievance in grievances:
-        response.append(GrievanceRead(
-            id=grievance.id,
-            title=grievance.title,
-            description=grievance.description,
-            redress_sought=grievance.redress_sought,
-            status=grievance.status,
-            submitter_name=grievance.submitter_name,
-            service_number=grievance.service_number,
-            rank=grievance.rank,
-            email=grievance.email,
-            phone=grievance.phone,
-            unit=grievance.unit,
-            position=grievance.position,
-            grievance_type=grievance.grievance_type,
-            grievance_subtype=grievance.grievance_subtype,
-            created_at=grievance.created_at,
-            user_id=grievance.user_id,
-            notes=[]  # Initialize with empty notes
-        ))
-    return response
+        # Paging through a pass: its position bounds the scan, and its
+        # watermark is kept for the pass after it
+        start, after = token.after[0], token.after
+    if token is not None and token.after is not None:
+        watermark = token.watermark
+    else:
+        watermark = now - timedelta(seconds=CHANGES_OVERLAP_SECONDS)
+
+    rows = (await session.execute(changes_query(current_user, start, after, limit))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_token = SyncToken(watermark, (rows[-1].changed_at, rows[-1].id) if has_more else None, scope)
+
+    live_ids = [row.id for row in rows if not row.deleted]
+    summaries = {}
+    if live_ids:
+        result = await session.execute(
+            with_list_columns(select(Grievance), SUMMARY_FIELDS).where(Grievance.id.in_(live_ids))
+        )
+        summaries = {row.id: GrievanceSummary(**row._mapping) for row in result}
+    return GrievanceChanges(
+        # A grievance deleted since the page was read is simply left out
+        items=[summaries[row.id] for row in rows if row.id in summaries],
+        deleted=[GrievanceTombstone(id=row.id, deleted_at=row.changed_at) for row in rows if row.deleted],
+        next_token=encode_sync_token(next_token),
+        has_more=has_more
+    )
+
+@router.get("/events", response_class=StreamingResponse)
+async def grievance_events(
+    request: Request,
+    current_user: User = Depends(current_reader),
+):
+    """Server-sent events for changes to grievances the caller can see.
+
+    Event types are grievance.created, grievance.updated, grievance.deleted
+    and note.created. Reconnecting with Last-Event-ID replays what was
+    missed; an `event: reset` means that was not possible and the client
+    should reload its grievances.
+    """
+    def visible(owner_id: uuid.UUID, unit: str) -> bool:
+        return can_view(current_user, owner_id, unit)
+
+    return StreamingResponse(
+        event_stream(event_hub, visible, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        # Proxies must neither cache nor buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-@router.get("/{grievance_id}", response_model=GrievanceRead)
+@router.get("/{grievance_id}", response_model=GrievanceDetail)
 async def read_grievance(
     grievance_id: uuid.UUID,
-    current_user: User = Depends(current_user),
+    request: Request,
+    current_user: User = Depends(current_reader),
     session: AsyncSession = Depends(get_async_session),
+    loader: UserLoader = Depends(get_user_loader),
 ):
+    key = f"grievance|{grievance_id}"
+    entry = response_cache.get(key)
+    if entry is not None:
+        if not can_view(current_user, entry.meta["user_id"], entry.meta["unit"]):
+            raise HTTPException(status_code=403, detail="Not authorized to access this grievance")
+        return cached_response(entry, request)
+
+    # Check existence, permissions and the client's cached copy before loading anything
+    generation = response_cache.generation
+    version = (await session.execute(grievance_version_query(grievance_id))).one_or_none()
+    if not version:
+        raise HTTPException(status_code=404, detail="Grievance not found")
+    if not can_view(current_user, version.user_id, version.unit):
+        raise HTTPException(status_code=403, detail="Not authorized to access this grievance")
+
+    # Author names shown on notes are not part of the version; a renamed
+    # author only shows up once the grievance or its notes change
+    etag = make_etag(grievance_id, version.updated_at, version.note_count, version.last_note_at)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
     query = select(Grievance).where(Grievance.id == grievance_id)
     result = await session.execute(query)
     grievance = result.scalar_one_or_none()
@@ -111,51 +739,20 @@ async def read_grievance(
     if not grievance:
         raise HTTPException(status_code=404, detail="Grievance not found")
     
-    # Check permissions
-    if current_user.role == UserRole.admin or \
-       (current_user.role == UserRole.supervisor and (grievance.unit == current_user.unit or grievance.user_id == current_user.id)) or \
-       grievance.user_id == current_user.id:
-        
-        # Load notes for this grievance
-        notes_query = select(Note).where(Note.grievance_id == grievance_id).order_by(Note.created_at.desc())
-        notes_result = await session.execute(notes_query)
-        notes = notes_result.scalars().all()
-        
-        # Create note responses with user names
-        note_responses = []
-        for note in notes:
-            user = await session.get(User, note.user_id)
-            note_responses.append(NoteRead(
-                id=note.id,
-                content=note.content,
-                created_at=note.created_at,
-                user_id=note.user_id,
-                grievance_id=note.grievance_id,
-                user_name=user.name or user.email
-            ))
-        
-        # Create response with notes
-        return GrievanceRead(
-            id=grievance.id,
-            title=grievance.title,
-            description=grievance.description,
-            redress_sought=grievance.redress_sought,
-            status=grievance.status,
-            submitter_name=grievance.submitter_name,
-            service_number=grievance.service_number,
-            rank=grievance.rank,
-            email=grievance.email,
-            phone=grievance.phone,
-            unit=grievance.unit,
-            position=grievance.position,
-            grievance_type=grievance.grievance_type,
-            grievance_subtype=grievance.grievance_subtype,
-            created_at=grievance.created_at,
-            user_id=grievance.user_id,
-            notes=note_responses
-        )
-        
-    raise HTTPException(status_code=403, detail="Not authorized to access this grievance")
+    # Only the newest notes are embedded; the rest are paged through GET /{id}/notes
+    notes_result = await session.execute(notes_page_query(grievance_id, None, DETAIL_NOTE_LIMIT))
+    notes, notes_next_cursor = split_page(notes_result.scalars().all(), DETAIL_NOTE_LIMIT)
+    
+    # Create note responses with user names
+    note_responses = await notes_to_read(notes, loader)
+    
+    # Create response with notes
+    content = grievance_to_read(grievance, notes=note_responses, model=GrievanceDetail, notes_next_cursor=notes_next_cursor)
+    entry = response_cache.set(
+        key, serialize(content), etag, {f"grievance:{grievance_id}"}, generation,
+        meta={"user_id": grievance.user_id, "unit": grievance.unit}
+    )
+    return cached_response(entry, request)
 
 @router.put("/{grievance_id}", response_model=GrievanceRead)
 async def update_grievance(
@@ -181,33 +778,18 @@ async def update_grievance(
         raise HTTPException(status_code=403, detail="Not authorized to update this grievance")
     
     # Update fields
+    previous_unit = grievance.unit
     update_data = grievance_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(grievance, field, value)
     
     await session.commit()
     await session.refresh(grievance)
+    response_cache.invalidate(grievance_tags(grievance.id, grievance.user_id, previous_unit, grievance.unit))
+    publish_grievance_event("grievance.updated", grievance, previous_unit, grievance.unit)
     
     # Create response object with empty notes array
-    response = GrievanceRead(
-        id=grievance.id,
-        title=grievance.title,
-        description=grievance.description,
-        redress_sought=grievance.redress_sought,
-        status=grievance.status,
-        submitter_name=grievance.submitter_name,
-        service_number=grievance.service_number,
-        rank=grievance.rank,
-        email=grievance.email,
-        phone=grievance.phone,
-        unit=grievance.unit,
-        position=grievance.position,
-        grievance_type=grievance.grievance_type,
-        grievance_subtype=grievance.grievance_subtype,
-        created_at=grievance.created_at,
-        user_id=grievance.user_id,
-        notes=[]  # Initialize with empty notes
-    )
+    response = grievance_to_read(grievance)
     return response
 
 @router.delete("/{grievance_id}")
@@ -234,48 +816,46 @@ async def delete_grievance(
             detail="Not authorized to delete this grievance"
         )
     
+    tags = grievance_tags(grievance.id, grievance.user_id, grievance.unit)
     await session.delete(grievance)
     await session.commit()
+    response_cache.invalidate(tags)
+    event_hub.publish(
+        "grievance.deleted", grievance.id, grievance.user_id, (grievance.unit,),
+        {"id": grievance.id, "unit": grievance.unit, "user_id": grievance.user_id}
+    )
     
     return {"message": "Grievance deleted successfully"}
 
-@router.get("/user/{user_id}", response_model=list[GrievanceRead])
+@router.get("/user/{user_id}", response_model=Union[GrievancePage, GrievanceFieldsPage, List[GrievanceListRow], List[Dict[str, Any]]])
 async def read_user_grievances(
     user_id: uuid.UUID,
-    current_user: User = Depends(current_user),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    paginate: bool = Query(True, description="Set to false to return every grievance as a plain list"),
+    filters: GrievanceFilters = Depends(grievance_filters),
+    fields: Optional[List[str]] = Depends(list_fields),
+    current_user: User = Depends(current_reader),
     session: AsyncSession = Depends(get_async_session),
 ):
     # Check permissions
     if current_user.id != user_id and current_user.role not in [UserRole.admin, UserRole.supervisor]:
         raise HTTPException(status_code=403, detail="Not authorized to view these grievances")
     
-    query = select(Grievance).where(Grievance.user_id == user_id)
-    result = await session.execute(query)
-    grievances = result.scalars().all()
-    
-    # Create response objects with empty notes arrays
-    response = []
-    for grievance in grievances:
-        response.append(GrievanceRead(
-            id=grievance.id,
-            title=grievance.title,
-            description=grievance.description,
-            redress_sought=grievance.redress_sought,
-            status=grievance.status,
-            submitter_name=grievance.submitter_name,
-            service_number=grievance.service_number,
-            rank=grievance.rank,
-            email=grievance.email,
-            phone=grievance.phone,
-            unit=grievance.unit,
-            position=grievance.position,
-            grievance_type=grievance.grievance_type,
-            grievance_subtype=grievance.grievance_subtype,
-            created_at=grievance.created_at,
-            user_id=grievance.user_id,
-            notes=[]  # Initialize with empty notes
-        ))
-    return response
+    # The list only depends on whose grievances they are, so every permitted viewer shares it
+    generation = response_cache.generation
+    scope = f"owner:{user_id}"
+    key = cache_key("grievances/user", scope, request)
+    entry = response_cache.get(key)
+    if entry is None:
+        queries = [user_grievances_query(user_id)]
+        etag = await list_etag(session, queries, filters, paginate, cursor, limit, scope)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        content = await list_grievances(session, queries, filters, paginate, cursor, limit, fields)
+        entry = response_cache.set(key, serialize(content), etag, {f"grievances:user:{user_id}"}, generation)
+    return cached_response(entry, request)
 
 @router.post("/{grievance_id}/notes", response_model=NoteRead)
 async def create_note(
@@ -296,8 +876,12 @@ async def create_note(
         user_id=current_user.id
     )
     db.add(db_note)
+    await db.flush()
+    await enqueue_notifications(db, "note.created", grievance, note=db_note, actor=current_user)
     await db.commit()
     await db.refresh(db_note)
+    # Lists show note counts too, so they are invalidated along with the detail
+    response_cache.invalidate(grievance_tags(grievance.id, grievance.user_id, grievance.unit))
     
     # Create response with user name
     response = NoteRead(
@@ -308,37 +892,35 @@ async def create_note(
         grievance_id=db_note.grievance_id,
         user_name=current_user.name or current_user.email
     )
+    event_hub.publish("note.created", grievance.id, grievance.user_id, (grievance.unit,), response.model_dump())
     return response
 
-@router.get("/{grievance_id}/notes", response_model=List[NoteRead])
+@router.get("/{grievance_id}/notes", response_model=Union[NotePage, List[NoteRead]])
 async def get_notes(
     grievance_id: uuid.UUID,
-    current_user: User = Depends(current_user),
-    db: AsyncSession = Depends(get_async_session)
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    paginate: bool = Query(True, description="Set to false to return every note as a plain list"),
+    current_user: User = Depends(current_reader),
+    db: AsyncSession = Depends(get_async_session),
+    loader: UserLoader = Depends(get_user_loader),
 ):
-    """Get all notes for a grievance."""
+    """Get a grievance's notes, newest first."""
     # Check if grievance exists and user has access
-    grievance = await db.get(Grievance, grievance_id)
+    grievance = (await db.execute(
+        select(Grievance.user_id, Grievance.unit).where(Grievance.id == grievance_id)
+    )).one_or_none()
     if not grievance:
         raise HTTPException(status_code=404, detail="Grievance not found")
+    if not can_view(current_user, grievance.user_id, grievance.unit):
+        raise HTTPException(status_code=403, detail="Not authorized to access this grievance")
 
-    result = await db.execute(
-        select(Note)
-        .where(Note.grievance_id == grievance_id)
-        .order_by(Note.created_at.desc())
-    )
-    notes = result.scalars().all()
+    if not paginate:
+        result = await db.execute(notes_query(grievance_id))
+        return await notes_to_read(result.scalars().all(), loader)
+
+    result = await db.execute(notes_page_query(grievance_id, cursor, limit))
+    notes, next_cursor = split_page(result.scalars().all(), limit)
     
     # Create response with user names
-    response = []
-    for note in notes:
-        user = await db.get(User, note.user_id)
-        response.append(NoteRead(
-            id=note.id,
-            content=note.content,
-            created_at=note.created_at,
-            user_id=note.user_id,
-            grievance_id=note.grievance_id,
-            user_name=user.name or user.email
-        ))
-    return response 
\ No newline at end of file
+    return NotePage(items=await notes_to_read(notes, loader), next_cursor=next_cursor)
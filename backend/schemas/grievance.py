@@ -1,6 +1,7 @@
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, Field, UUID4
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
+import enum
 from models.grievance import GrievanceStatus
 
 class NoteCreate(BaseModel):
@@ -78,7 +79,125 @@ class GrievanceRead(BaseModel):
     grievance_subtype: str
     created_at: datetime
     user_id: UUID4
+    note_count: int = 0
+    last_note_at: Optional[datetime] = None
+    last_activity_at: Optional[datetime] = None  # Latest of the last update and the last note
     notes: List[NoteRead] = []
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class GrievanceListRow(GrievanceRead):
+    """A grievance in an unpaginated list, with its owner's display name."""
+    owner_name: str
+
+class GrievanceDetail(GrievanceRead):
+    """A single grievance; `notes` holds only the newest notes, `note_count` counts them all."""
+    notes_next_cursor: Optional[str] = None  # Pass as ?cursor= to GET /grievances/{id}/notes for older notes
+
+class NotePage(BaseModel):
+    items: List[NoteRead]
+    next_cursor: Optional[str] = None
+
+class GrievanceSummary(BaseModel):
+    """What a list row shows; leaves out the long text and contact fields."""
+    id: UUID4
+    title: str
+    status: GrievanceStatus
+    unit: str
+    grievance_type: str
+    grievance_subtype: str
+    created_at: datetime
+    updated_at: datetime
+    user_id: UUID4
+    owner_name: str
+    note_count: int
+    last_activity_at: Optional[datetime] = None
+
+class GrievancePage(BaseModel):
+    items: List[GrievanceSummary]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to fetch the following page
+
+class GrievanceFieldsPage(BaseModel):
+    items: List[Dict[str, Any]]  # Only the columns asked for with ?fields=, plus id
+    next_cursor: Optional[str] = None
+
+class GrievanceTombstone(BaseModel):
+    id: UUID4
+    deleted_at: datetime
+
+class GrievanceChanges(BaseModel):
+    items: List[GrievanceSummary]  # Created or updated, or with new notes; may repeat items sent before
+    deleted: List[GrievanceTombstone]  # Deleted, or moved to a unit or owner the caller cannot see
+    next_token: str  # Pass back as ?since= on the next call
+    has_more: bool  # More changes are waiting; call again right away with next_token
+
+class GrievanceSearchHit(GrievanceRead):
+    score: float  # bm25, lower is a better match
+    snippet: str  # Matched text with hits wrapped in <mark>; not HTML-escaped
+
+class GrievanceSearchPage(BaseModel):
+    items: List[GrievanceSearchHit]
+    next_offset: Optional[int] = None
+
+class GrievanceStatRead(BaseModel):
+    unit: str
+    status: GrievanceStatus
+    grievance_type: str
+    month: str  # YYYY-MM of created_at
+    count: int
+
+class GrievanceImportError(BaseModel):
+    line: int  # 1-based line in the uploaded file where the record starts
+    error: str
+
+class GrievanceImportResult(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[GrievanceImportError] = []
+    errors_truncated: bool = False  # More rows failed than are listed
+
+# One statement binds every id, so this stays well under SQLite's 32766 variable limit
+BULK_STATUS_MAX_IDS = 5000
+
+class GrievanceBulkStatus(BaseModel):
+    ids: List[UUID4] = Field(min_length=1, max_length=BULK_STATUS_MAX_IDS)
+    status: GrievanceStatus
+
+class BulkStatusOutcome(str, enum.Enum):
+    updated = "updated"
+    unchanged = "unchanged"  # Already had the requested status
+    forbidden = "forbidden"
+    not_found = "not_found"
+
+class GrievanceBulkStatusItem(BaseModel):
+    id: UUID4
+    outcome: BulkStatusOutcome
+
+class GrievanceBulkStatusResult(BaseModel):
+    updated: int = 0
+    results: List[GrievanceBulkStatusItem] = []  # One per distinct id, in request order
+
+class GrievanceSort(str, enum.Enum):
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    updated_at = "updated_at"
+    updated_at_desc = "-updated_at"
+
+    @property
+    def field(self) -> str:
+        return self.value.lstrip("-")
+
+    @property
+    def descending(self) -> bool:
+        return self.value.startswith("-")
+
+class GrievanceFilters(BaseModel):
+    """Query parameters narrowing a grievance list. All filters are ANDed."""
+    status: Optional[List[GrievanceStatus]] = None  # Repeat to match any of several
+    grievance_type: Optional[str] = None
+    grievance_subtype: Optional[str] = None
+    unit: Optional[str] = None
+    created_from: Optional[datetime] = None  # Inclusive
+    created_to: Optional[datetime] = None  # Exclusive
+    sort: GrievanceSort = GrievanceSort.created_at
@@ -0,0 +1,330 @@
+"""Benchmark the API in-process at several data scales.
+
+For each scale a seeded database is generated once with
+populate_test_data.py and cached; every run works on a fresh copy of it.
+The app is driven through httpx's ASGITransport as a regular user, a
+supervisor and an admin, and each operation reports throughput and
+p50/p95/p99 latency.
+
+    python scripts/bench_endpoints.py run --scales 1k 100k --output after.json
+    python scripts/bench_endpoints.py run --scales 1k --baseline before.json --threshold 15
+    python scripts/bench_endpoints.py compare before.json after.json --threshold 15
+
+The response cache is off unless --cache says otherwise: the repeated
+reads would otherwise be answered from it and the numbers would stop
+reflecting the routes and the database. Run once with --cache local to
+measure the cached path; results from different cache settings are not
+comparable.
+
+Comparisons flag an operation whose chosen percentile (--metric, default
+p95) got slower by more than --threshold percent, and exit non-zero if any
+did.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+SCALE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+OPERATIONS = ["list", "detail", "create", "update", "notes", "login"]
+ADMIN_EMAIL, ADMIN_PASSWORD = "admin@jsis.com", "123"
+GENERATED_PASSWORD = "password"  # populate_test_data.py gives every account this password
+
+def parse_scale(value: str) -> int:
+    suffix = value[-1].lower()
+    if suffix in SCALE_SUFFIXES:
+        return int(float(value[:-1]) * SCALE_SUFFIXES[suffix])
+    return int(value)
+
+def scale_label(scale: int) -> str:
+    for suffix, size in sorted(SCALE_SUFFIXES.items(), key=lambda item: -item[1]):
+        if scale >= size and scale % size == 0:
+            return f"{scale // size}{suffix.upper() if suffix == 'm' else suffix}"
+    return str(scale)
+
+def percentile(ordered, p: float) -> float:
+    # Nearest-rank on an already sorted list
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2) if ordered else None,
+        **{f"p{p}_ms": round(percentile(ordered, p) * 1000, 2) if ordered else None for p in (50, 95, 99)},
+    }
+
+# --- Worker: runs inside a subprocess with DATABASE_URL pointing at a copy ---
+
+async def measure(name, call, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def loop():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await call()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[loop() for _ in range(concurrency)])
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    print(f"    {name:7} {result['rps']:>8} req/s  p50 {result['p50_ms']}ms  p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms"
+          + (f"  {errors} errors" if errors else ""), file=sys.stderr)
+    return result
+
+async def pick_accounts() -> dict:
+    """Find the busiest regular user and that user's unit supervisor, plus sample grievance ids per role."""
+    from sqlalchemy import func, select
+    from database import async_session_maker
+    from models.grievance import Grievance
+    from models.user import User, UserRole
+    from routes.grievances import visible_grievances_query
+
+    async with async_session_maker() as session:
+        user = (await session.execute(
+            select(User).join(Grievance, Grievance.user_id == User.id)
+            .where(User.role == UserRole.user)
+            .group_by(User.id).order_by(func.count().desc(), User.email).limit(1)
+        )).scalar_one()
+        supervisor = (await session.execute(
+            select(User).where(User.role == UserRole.supervisor, User.unit == user.unit).order_by(User.email).limit(1)
+        )).scalar_one()
+        admin = (await session.execute(select(User).where(User.email == ADMIN_EMAIL))).scalar_one()
+
+        accounts = {}
+        for role, account, password in (
+            ("user", user, GENERATED_PASSWORD),
+            ("supervisor", supervisor, GENERATED_PASSWORD),
+            ("admin", admin, ADMIN_PASSWORD),
+        ):
+            ids = (await session.execute(
+                visible_grievances_query(account).with_only_columns(Grievance.id).limit(1000)
+            )).scalars().all()
+            accounts[role] = {"email": account.email, "password": password, "ids": [str(i) for i in ids]}
+    return accounts
+
+async def run_worker(args) -> dict:
+    """Benchmark every role; returns the results and the engine settings read back from the database."""
+    from httpx import ASGITransport, AsyncClient
+    from app import app
+    from database import describe_engine
+
+    rng = random.Random(args.seed)
+    grievance = dict(
+        title="Benchmark grievance", description="x" * 500, redress_sought="y" * 200,
+        submitter_name="Bench Mark", service_number="A12345", rank="Cpl", email="bench@forces.gc.ca",
+        phone="613-555-0000", unit="CSOR", position="Operator", grievance_type="Other", grievance_subtype="Leave",
+    )
+    statuses = ["pending", "in_progress", "resolved"]
+    results = {}
+    async with app.router.lifespan_context(app):
+        # The URL names this run's temporary copy; the rest is what runs are compared on
+        engine = {key: value for key, value in (await describe_engine()).items() if key != "url"}
+        accounts = await pick_accounts()
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            for role, account in accounts.items():
+                print(f"  {role} ({account['email']})", file=sys.stderr)
+                credentials = {"username": account["email"], "password": account["password"]}
+                login = await client.post("/auth/jwt/login", data=credentials)
+                login.raise_for_status()
+                headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+                ids = account["ids"]
+                calls = {
+                    "list": lambda: client.get("/grievances", params={"limit": 50}, headers=headers),
+                    "detail": lambda: client.get(f"/grievances/{rng.choice(ids)}", headers=headers),
+                    "create": lambda: client.post("/grievances", json=grievance, headers=headers),
+                    "update": lambda: client.put(f"/grievances/{rng.choice(ids)}", json={"status": rng.choice(statuses)}, headers=headers),
+                    "notes": lambda: client.get(f"/grievances/{rng.choice(ids)}/notes", headers=headers),
+                    "login": lambda: client.post("/auth/jwt/login", data=credentials),
+                }
+                results[role] = {}
+                for name in args.operations:
+                    requests = args.login_requests if name == "login" else args.requests
+                    # Warm caches and connections so the first samples are not outliers
+                    for _ in range(min(args.warmup, requests)):
+                        await calls[name]()
+                    results[role][name] = await measure(name, calls[name], requests, args.concurrency)
+    return {"engine": engine, "results": results}
+
+# --- Driver ---
+
+def seed_database(scale: int, args) -> str:
+    """Generate (or reuse) the cached database for a scale and return its path."""
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = os.path.join(args.data_dir, f"bench-{scale_label(scale)}-s{args.seed}.db")
+    if os.path.exists(path):
+        return path
+    units = 7  # populate_test_data.UNITS
+    print(f"Generating {scale_label(scale)} grievances into {path}", file=sys.stderr)
+    subprocess.run(
+        [
+            sys.executable, os.path.join(BACKEND_DIR, "scripts", "populate_test_data.py"),
+            "--seed", str(args.seed),
+            "--grievances-per-unit", str(max(1, scale // units)),
+            "--users-per-unit", str(max(5, scale // 2000)),
+            "--notes-per-grievance", "1",
+            "--skew", "1",
+        ],
+        env={**os.environ, "DATABASE_URL": f"sqlite+aiosqlite:///{path}"},
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return path
+
+def run_scale(scale: int, args) -> dict:
+    seed_path = seed_database(scale, args)
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        # Writes during the run must not leak into the next run's starting data
+        path = os.path.join(workdir, "bench.db")
+        result_path = os.path.join(workdir, "result.json")
+        shutil.copy(seed_path, path)
+        print(f"Scale {scale_label(scale)}", file=sys.stderr)
+        worker_args = [
+            "--worker", "--seed", str(args.seed), "--requests", str(args.requests),
+            "--login-requests", str(args.login_requests), "--concurrency", str(args.concurrency),
+            "--warmup", str(args.warmup), "--operations", *args.operations, "--output", result_path,
+        ]
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{path}",
+            "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+            # core/cache.py reads this at import time, before the worker loads app
+            "CACHE_BACKEND": args.cache,
+        }
+        # The app logs to stdout, so results come back through a file
+        subprocess.run([sys.executable, os.path.abspath(__file__), "run", *worker_args], env=env, check=True)
+        with open(result_path) as f:
+            return json.load(f)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(baseline: dict, current: dict, metric: str, threshold: float) -> int:
+    """Print per-operation changes and return the number of regressions."""
+    key = f"{metric}_ms"
+    for setting in ("engine", "auth_mode", "cache_backend"):
+        before, after = baseline["meta"].get(setting), current["meta"].get(setting)
+        if before != after:
+            print(f"Warning: runs differ in {setting}: {before} -> {after}")
+    regressions = 0
+    for scale, roles in current["results"].items():
+        for role, operations in roles.items():
+            for name, result in operations.items():
+                before = baseline["results"].get(scale, {}).get(role, {}).get(name)
+                if not before or not before.get(key) or result.get(key) is None:
+                    continue
+                change = (result[key] - before[key]) / before[key] * 100
+                flag = ""
+                if change > threshold:
+                    regressions += 1
+                    flag = "  REGRESSION"
+                print(f"{scale:>5} {role:10} {name:7} {metric} {before[key]:>9}ms -> {result[key]:>9}ms  {change:+6.1f}%{flag}")
+    print(f"{regressions} regression(s) above {threshold}% on {metric}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmark")
+    run.add_argument("--scales", nargs="+", default=["1k"], help="Grievance counts, e.g. 1k 100k 1M")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--requests", type=int, default=200, help="Requests per operation and role")
+    run.add_argument("--login-requests", type=int, default=20, help="Logins are slow by design; fewer samples")
+    run.add_argument("--concurrency", type=int, default=1)
+    run.add_argument("--warmup", type=int, default=5)
+    run.add_argument("--operations", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    run.add_argument("--cache", choices=["off", "local"], default="off",
+                     help="Response cache backend for the run; off measures the routes and database")
+    run.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "grievance-bench"),
+                     help="Where seeded databases are cached between runs")
+    run.add_argument("--output", help="Write results JSON here (default: stdout)")
+    run.add_argument("--baseline", help="Results JSON to compare against after the run")
+    run.add_argument("--metric", choices=["p50", "p95", "p99"], default="p95")
+    run.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+    run.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    diff = commands.add_parser("compare", help="Compare two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--metric", choices=["p50", "p95", "p99"], default="p95")
+    diff.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        return 1 if compare(baseline, current, args.metric, args.threshold) else 0
+
+    if args.worker:
+        results = asyncio.run(run_worker(args))
+        with open(args.output, "w") as f:
+            json.dump(results, f)
+        return 0
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    runs = {scale_label(scale): run_scale(scale, args) for scale in map(parse_scale, args.scales)}
+    # Every scale runs under the same environment, so any run's engine report stands for all
+    engine = next(iter(runs.values()))["engine"]
+    report = {
+        "meta": {
+            "started_at": started_at,
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "db_profile": engine["profile"],
+            "engine": engine,
+            "auth_mode": os.getenv("AUTH_MODE", "database"),
+            "cache_backend": args.cache,
+            "seed": args.seed,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "concurrency": args.concurrency,
+        },
+        "results": {label: run["results"] for label, run in runs.items()},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            return 1 if compare(json.load(f), report, args.metric, args.threshold) else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+"""Measure how a login flood affects the latency of unrelated requests.
+
+Runs the app in-process (httpx ASGITransport) once per password hashing
+mode. Each run first measures grievance list and detail GETs on their own
+("quiet"), then again while a flood of logins is in progress ("storm").
+With hashing on the event loop ("inline", the fastapi-users default) every
+GET waits behind whole hashes; with the worker pool ("pool") it should not.
+
+    python scripts/bench_login_storm.py
+    python scripts/bench_login_storm.py --logins 400 --login-concurrency 64 --output storm.json
+
+The hashing pool is sized by PASSWORD_HASH_WORKERS and PASSWORD_HASH_MAX_QUEUE
+as usual; a login refused because the queue is full counts as rejected.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from bench_endpoints import ADMIN_EMAIL, ADMIN_PASSWORD, git_revision, summarize
+
+MODES = ["inline", "pool"]
+
+# --- Worker: runs inside a subprocess with its own empty database ---
+
+async def traffic(calls, latencies, errors, until_done, interval: float):
+    """One client issuing GETs back to back (with `interval` between them) until `until_done()`."""
+    while not until_done():
+        started = time.perf_counter()
+        response = await random.choice(calls)()
+        latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+        await asyncio.sleep(interval)
+
+async def run_worker(args) -> dict:
+    from httpx import ASGITransport, AsyncClient
+    from app import app
+
+    grievance = dict(
+        title="Storm grievance", description="x" * 500, redress_sought="y" * 200,
+        submitter_name="Storm Test", service_number="A12345", rank="Cpl", email="storm@forces.gc.ca",
+        phone="613-555-0000", unit="CSOR", position="Operator", grievance_type="Other", grievance_subtype="Leave",
+    )
+    credentials = {"username": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+            login = await client.post("/auth/jwt/login", data=credentials)
+            login.raise_for_status()
+            headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+            ids = []
+            for _ in range(args.grievances):
+                response = await client.post("/grievances", json=grievance, headers=headers)
+                response.raise_for_status()
+                ids.append(response.json()["id"])
+            calls = [
+                lambda: client.get("/grievances", params={"limit": 50}, headers=headers),
+                lambda: client.get(f"/grievances/{random.choice(ids)}", headers=headers),
+            ]
+
+            # Quiet: the same GET traffic with nothing else going on
+            quiet, quiet_errors = [], []
+            await asyncio.gather(*[
+                traffic(calls, quiet, quiet_errors, lambda: len(quiet) >= args.gets, args.interval)
+                for _ in range(args.get_concurrency)
+            ])
+
+            # Storm: GET traffic runs until every login has finished
+            storm, storm_errors = [], []
+            logins, login_statuses = [], []
+            remaining = args.logins
+
+            async def flood():
+                nonlocal remaining
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    response = await client.post("/auth/jwt/login", data=credentials)
+                    logins.append(time.perf_counter() - started)
+                    login_statuses.append(response.status_code)
+
+            started = time.perf_counter()
+            flood_done = asyncio.gather(*[flood() for _ in range(args.login_concurrency)])
+            await asyncio.gather(flood_done, *[
+                traffic(calls, storm, storm_errors, flood_done.done, args.interval)
+                for _ in range(args.get_concurrency)
+            ])
+            elapsed = time.perf_counter() - started
+
+    rejected = login_statuses.count(503)
+    failed = sum(1 for status in login_statuses if status >= 400 and status != 503)
+    return {
+        "quiet": summarize(quiet, len(quiet_errors), 0),
+        "storm": summarize(storm, len(storm_errors), 0),
+        "logins": {**summarize(logins, failed, elapsed), "rejected": rejected},
+    }
+
+# --- Driver ---
+
+def run_mode(mode: str, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="storm-")
+    try:
+        result_path = os.path.join(workdir, "result.json")
+        print(f"Mode {mode}", file=sys.stderr)
+        worker_args = [
+            "--worker", "--logins", str(args.logins), "--login-concurrency", str(args.login_concurrency),
+            "--gets", str(args.gets), "--get-concurrency", str(args.get_concurrency),
+            "--interval", str(args.interval), "--grievances", str(args.grievances), "--output", result_path,
+        ]
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'storm.db')}",
+            "PASSWORD_HASH_MODE": mode,
+            "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+        }
+        # The app logs to stdout, so results come back through a file
+        subprocess.run([sys.executable, os.path.abspath(__file__), *worker_args], env=env, check=True)
+        with open(result_path) as f:
+            result = json.load(f)
+        for phase in ("quiet", "storm"):
+            r = result[phase]
+            print(f"    GET {phase:5}  p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  p99 {r['p99_ms']}ms  ({r['requests']} requests)",
+                  file=sys.stderr)
+        r = result["logins"]
+        print(f"    login      {r['rps']} logins/s  p99 {r['p99_ms']}ms  {r['rejected']} rejected  {r['errors']} failed",
+              file=sys.stderr)
+        return result
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--logins", type=int, default=200, help="Logins in the flood")
+    parser.add_argument("--login-concurrency", type=int, default=32, help="Logins in flight at once")
+    parser.add_argument("--gets", type=int, default=500, help="GETs in the quiet phase")
+    parser.add_argument("--get-concurrency", type=int, default=4, help="Clients issuing GETs")
+    parser.add_argument("--interval", type=float, default=0.005, help="Pause between one client's GETs, in seconds")
+    parser.add_argument("--grievances", type=int, default=50, help="Grievances created for the GETs to read")
+    parser.add_argument("--output", help="Write results JSON here (default: stdout)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        results = asyncio.run(run_worker(args))
+        with open(args.output, "w") as f:
+            json.dump(results, f)
+        return 0
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "password_hash_workers": os.getenv("PASSWORD_HASH_WORKERS", "default"),
+            "logins": args.logins,
+            "login_concurrency": args.login_concurrency,
+            "get_concurrency": args.get_concurrency,
+        },
+        "results": {mode: run_mode(mode, args) for mode in args.modes},
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+    print(f"{'mode':8} {'quiet p99':>10} {'storm p99':>10}", file=sys.stderr)
+    for mode, result in report["results"].items():
+        print(f"{mode:8} {result['quiet']['p99_ms']:>8}ms {result['storm']['p99_ms']:>8}ms", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Compare engine profiles under concurrent readers and writers.
+
+Each profile gets a fresh database file. Readers page through the grievance
+list while writers insert grievances, one transaction per write, and
+updaters load, change and commit existing grievances the way
+PUT /grievances/{id} does, for a fixed duration. Reports operations per
+second and "database is locked" failures.
+
+    python scripts/bench_sqlite_contention.py --readers 16 --writers 4 --updaters 4 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from database import Base, ENGINE_PROFILES, build_engine
+from models.user import User
+from models.grievance import Grievance
+
+def grievance_row(user_id):
+    return dict(
+        id=uuid.uuid4(), user_id=user_id, unit="CSOR", title="Benchmark grievance",
+        submitter_name="Bench Mark", service_number="A12345", rank="Cpl",
+        email="bench@forces.gc.ca", phone="613-555-0000", position="Operator",
+        grievance_type="Other", grievance_subtype="Leave",
+        description="x" * 500, redress_sought="y" * 200,
+    )
+
+async def run_profile(profile, readers: int, writers: int, updaters: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = build_engine(f"sqlite+aiosqlite:///{path}", profile)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        user_id = uuid.uuid4()
+        await conn.execute(insert(User).values(
+            id=user_id, email="bench@forces.gc.ca", hashed_password="x",
+            is_active=True, is_superuser=False, is_verified=True,
+        ))
+        await conn.execute(insert(Grievance), [grievance_row(user_id) for _ in range(1000)])
+
+    counts = {"reads": 0, "writes": 0, "updates": 0, "locked": 0}
+    deadline = time.monotonic() + seconds
+
+    async def reader():
+        query = select(Grievance).where(Grievance.unit == "CSOR").order_by(Grievance.created_at, Grievance.id).limit(50)
+        while time.monotonic() < deadline:
+            try:
+                async with engine.connect() as conn:
+                    (await conn.execute(query)).all()
+                counts["reads"] += 1
+            except OperationalError:
+                counts["locked"] += 1
+
+    async def writer():
+        while time.monotonic() < deadline:
+            try:
+                async with engine.begin() as conn:
+                    await conn.execute(insert(Grievance).values(**grievance_row(user_id)))
+                counts["writes"] += 1
+            except OperationalError:
+                counts["locked"] += 1
+
+    session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.connect() as conn:
+        ids = (await conn.execute(select(Grievance.id).limit(200))).scalars().all()
+
+    async def updater(n: int):
+        # Same shape as PUT /grievances/{id}: load the row, change it in
+        # Python, commit, then read it back
+        i = n
+        while time.monotonic() < deadline:
+            i += 1
+            try:
+                async with session_maker() as session:
+                    grievance = (await session.execute(select(Grievance).where(Grievance.id == ids[i % len(ids)]))).scalar_one()
+                    grievance.title = f"Benchmark grievance {i}"
+                    await session.commit()
+                    await session.refresh(grievance)
+                counts["updates"] += 1
+            except OperationalError:
+                counts["locked"] += 1
+
+    started = time.monotonic()
+    await asyncio.gather(
+        *[reader() for _ in range(readers)],
+        *[writer() for _ in range(writers)],
+        *[updater(n * 1000) for n in range(updaters)],
+    )
+    elapsed = time.monotonic() - started
+    await engine.dispose()
+
+    return {
+        "profile": profile.name,
+        "reads/s": round(counts["reads"] / elapsed, 1),
+        "writes/s": round(counts["writes"] / elapsed, 1),
+        "updates/s": round(counts["updates"] / elapsed, 1),
+        "locked errors": counts["locked"],
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4, help="Tasks inserting new grievances")
+    parser.add_argument("--updaters", type=int, default=4, help="Tasks updating existing grievances like PUT /grievances/{id}")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profiles", nargs="+", default=list(ENGINE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.updaters} updaters, {args.seconds}s per profile")
+    for name in args.profiles:
+        result = await run_profile(ENGINE_PROFILES[name], args.readers, args.writers, args.updaters, args.seconds)
+        print("  ".join(f"{key}: {value}" for key, value in result.items()))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Check that adding and repairing the activity columns leaves updated_at alone.
+
+Uses a throwaway database: writes grievances with old modification times,
+strips the activity columns and triggers to look like a database created
+before they existed, then runs the startup upgrade (create_db_and_tables)
+and the repair (recompute_activity). Passes when the columns come out
+consistent and no grievance's updated_at has moved.
+
+    python scripts/check_activity_upgrade.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# DATABASE_URL is read at import time, so it goes in before the app modules load
+_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db.name}"
+
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from database import async_session_maker, create_db_and_tables, engine
+from models.activity import ACTIVITY_TRIGGERS, check_activity, recompute_activity
+from models.grievance import Grievance, Note
+from models.user import User
+
+ACTIVITY_COLUMNS = ("note_count", "last_note_at", "last_activity_at")
+
+async def seed() -> None:
+    async with async_session_maker() as session:
+        user = User(email="owner@example.com", hashed_password="-")
+        session.add(user)
+        for i in range(5):
+            modified = datetime(2024, 1, 1) + timedelta(days=i)
+            grievance = Grievance(
+                title=f"Grievance {i}", description="d", redress_sought="r", submitter_name="s", service_number="1",
+                rank="Cpl", email="s@example.com", phone="1", unit="CSOR", position="p",
+                grievance_type="Other", grievance_subtype="Leave", user=user,
+                created_at=modified, updated_at=modified,
+            )
+            session.add(grievance)
+            await session.flush()
+            session.add_all(Note(content="n", grievance_id=grievance.id, user_id=user.id) for _ in range(i))
+        await session.commit()
+
+async def downgrade() -> None:
+    """Drop the activity triggers and columns, as in a database from before they existed."""
+    async with engine.begin() as conn:
+        for statement in ACTIVITY_TRIGGERS:
+            name = statement.split("EXISTS", 1)[1].split()[0]
+            await conn.execute(text(f"DROP TRIGGER {name}"))
+        for column in ACTIVITY_COLUMNS:
+            await conn.execute(text(f"ALTER TABLE grievance DROP COLUMN {column}"))
+
+async def modified_times() -> dict:
+    async with engine.connect() as conn:
+        return dict((await conn.execute(select(Grievance.id, Grievance.updated_at))).all())
+
+async def main() -> int:
+    failures = []
+    try:
+        await create_db_and_tables()
+        await seed()
+        await downgrade()
+        before = await modified_times()
+
+        await create_db_and_tables()
+        if await modified_times() != before:
+            failures.append("create_db_and_tables changed updated_at")
+        async with engine.begin() as conn:
+            if await conn.run_sync(check_activity):
+                failures.append("activity columns inconsistent after the upgrade")
+            await conn.run_sync(recompute_activity)
+        if await modified_times() != before:
+            failures.append("recompute_activity changed updated_at")
+    finally:
+        await engine.dispose()
+        os.unlink(_db.name)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,106 @@
+"""Check that GET /grievances/changes tells a client when a grievance leaves its view.
+
+Uses a throwaway database and drives the app in-process. A supervisor
+syncs a grievance from their unit; the admin moves it to another unit and
+back, then moves the supervisor. Passes when the move out arrives as a
+tombstone (but not for the owner, who can still see it), the move back as
+an item, and the supervisor's next sync after their own move is refused
+with 410.
+
+    python scripts/check_changes_scope.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# DATABASE_URL is read at import time, so it goes in before the app modules load
+_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db.name}"
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import update
+from app import app
+from database import engine
+from models.user import User, UserRole
+
+ADMIN_EMAIL, ADMIN_PASSWORD = "admin@jsis.com", "123"
+GRIEVANCE = dict(
+    title="Leave refused", description="d", redress_sought="r", submitter_name="s", service_number="1",
+    rank="Cpl", email="submitter@example.com", phone="1", unit="CSOR", position="p",
+    grievance_type="Other", grievance_subtype="Leave",
+)
+
+async def login(client: AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/auth/jwt/login", data={"username": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+async def register(client: AsyncClient, email: str, role: UserRole = UserRole.user) -> dict:
+    (await client.post("/auth/register", json={"email": email, "password": "password"})).raise_for_status()
+    async with engine.begin() as conn:
+        await conn.execute(update(User).where(User.email == email).values(role=role, unit="CSOR"))
+    return await login(client, email, "password")
+
+async def sync(client: AsyncClient, headers: dict, token=None):
+    """Follow next_token until caught up; returns (item ids, deleted ids, token), or the status code on an error."""
+    items, deleted = set(), set()
+    while True:
+        response = await client.get("/grievances/changes", params={"since": token} if token else {}, headers=headers)
+        if response.status_code != 200:
+            return response.status_code
+        body = response.json()
+        items |= {item["id"] for item in body["items"]}
+        deleted |= {tombstone["id"] for tombstone in body["deleted"]}
+        token = body["next_token"]
+        if not body["has_more"]:
+            return items, deleted, token
+
+async def main() -> int:
+    failures = []
+
+    def expect(condition: bool, message: str) -> None:
+        if not condition:
+            failures.append(message)
+
+    try:
+        async with app.router.lifespan_context(app):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://check") as client:
+                admin = await login(client, ADMIN_EMAIL, ADMIN_PASSWORD)
+                owner = await register(client, "owner@example.com")
+                supervisor = await register(client, "supervisor@example.com", UserRole.supervisor)
+                response = await client.post("/grievances", json=GRIEVANCE, headers=owner)
+                response.raise_for_status()
+                grievance_id = response.json()["id"]
+
+                items, _, supervisor_token = await sync(client, supervisor)
+                expect(grievance_id in items, "supervisor's first sync misses a grievance in their unit")
+                _, _, owner_token = await sync(client, owner)
+
+                (await client.put(f"/grievances/{grievance_id}", json={"unit": "RCR"}, headers=admin)).raise_for_status()
+                items, deleted, supervisor_token = await sync(client, supervisor, supervisor_token)
+                expect(grievance_id in deleted and grievance_id not in items, "move out of the unit is not a tombstone")
+                items, deleted, owner_token = await sync(client, owner, owner_token)
+                expect(grievance_id in items and grievance_id not in deleted, "owner lost a grievance they can still see")
+
+                (await client.put(f"/grievances/{grievance_id}", json={"unit": "CSOR"}, headers=admin)).raise_for_status()
+                items, deleted, supervisor_token = await sync(client, supervisor, supervisor_token)
+                expect(grievance_id in items and grievance_id not in deleted, "move back into the unit is not an item")
+
+                me = (await client.get("/users/me", headers=supervisor)).json()
+                (await client.patch(f"/users/{me['id']}", json={"unit": "RCR"}, headers=admin)).raise_for_status()
+                supervisor = await login(client, "supervisor@example.com", "password")
+                expect(await sync(client, supervisor, supervisor_token) == 410, "sync after the supervisor moved is not 410")
+                expect(isinstance(await sync(client, supervisor), tuple), "a fresh sync after the move fails")
+    finally:
+        await engine.dispose()
+        os.unlink(_db.name)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,101 @@
+"""End-to-end check of the notification outbox against the local SMTP sink.
+
+Uses a throwaway database: queues a new grievance and two notes for a unit
+with one supervisor, has the sink refuse the first recipient once, and
+drains the outbox. Passes when each recipient gets exactly one digest with
+all three events, the refused one only after a retry, and the outbox ends
+up empty; and when purging dead rows deletes only those past their
+retention.
+
+    python scripts/check_outbox.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time, so they go in before the app modules load
+_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db.name}"
+os.environ["OUTBOX_DIGEST_SECONDS"] = "0"
+os.environ["OUTBOX_BACKOFF_SECONDS"] = "0"
+os.environ["OUTBOX_LOCK_PATH"] = _db.name + ".lock"
+
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from database import async_session_maker, create_db_and_tables, engine
+from models.grievance import Grievance, Note
+from models.outbox import OutboxMessage
+from models.user import User, UserRole
+from core.outbox import OUTBOX_DEAD_RETENTION_DAYS, OutboxWorker, SmtpMailer, enqueue_notifications
+from scripts.smtp_sink import SmtpSink
+
+async def queue_events() -> None:
+    async with async_session_maker() as session:
+        supervisor = User(email="supervisor@example.com", hashed_password="-", role=UserRole.supervisor, unit="CSOR")
+        author = User(email="author@example.com", hashed_password="-", name="Author")
+        session.add_all([supervisor, author])
+        grievance = Grievance(
+            title="Leave refused", description="d", redress_sought="r", submitter_name="s", service_number="1",
+            rank="Cpl", email="submitter@example.com", phone="1", unit="CSOR", position="p",
+            grievance_type="Other", grievance_subtype="Leave", user=author,
+        )
+        session.add(grievance)
+        await session.flush()
+        await enqueue_notifications(session, "grievance.created", grievance)
+        for content in ("First note", "Second note"):
+            note = Note(content=content, grievance_id=grievance.id, user_id=author.id)
+            session.add(note)
+            await session.flush()
+            await enqueue_notifications(session, "note.created", grievance, note=note, actor=author)
+        await session.commit()
+
+async def main() -> int:
+    sink = SmtpSink(port=0, fail_first=1)
+    await sink.start()
+    try:
+        await create_db_and_tables()
+        await queue_events()
+        worker = OutboxWorker(mailer=SmtpMailer("127.0.0.1", sink.port))
+        passes = 0
+        while await worker.drain_once():
+            passes += 1
+        async with async_session_maker() as session:
+            left = await session.scalar(select(func.count()).select_from(OutboxMessage))
+
+        # Two dead rows, one past its retention
+        now = datetime.utcnow()
+        async with async_session_maker() as session:
+            await session.execute(insert(OutboxMessage), [
+                dict(recipient="gone@example.com", event_type="note.created", grievance_id=uuid.uuid4(), payload={},
+                     created_at=now - timedelta(days=days), available_at=None, attempts=8)
+                for days in (OUTBOX_DEAD_RETENTION_DAYS + 1, 1)
+            ])
+            await session.commit()
+        await worker.purge_dead()
+        async with async_session_maker() as session:
+            kept = (await session.execute(select(OutboxMessage.created_at))).scalars().all()
+    finally:
+        await sink.stop()
+        await engine.dispose()
+        os.unlink(_db.name)
+
+    digests = {message["To"]: message for message in sink.messages}
+    for recipient, message in sorted(digests.items()):
+        print(f"{recipient}: {message['Subject']}")
+    print(f"{len(sink.messages)} digest(s) sent in {passes} pass(es), {sink.refused} refused, {left} row(s) left")
+    print(f"{len(kept)} of 2 dead row(s) kept after the purge")
+    ok = (
+        sorted(digests) == ["submitter@example.com", "supervisor@example.com"]
+        and len(sink.messages) == 2
+        and all(message["Subject"] == "3 grievance updates" for message in sink.messages)
+        and sink.refused == 1 and passes == 2 and left == 0
+        and len(kept) == 1 and kept[0] > now - timedelta(days=OUTBOX_DEAD_RETENTION_DAYS)
+    )
+    print("OK" if ok else "FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,154 @@
+"""Fail if any grievance route query makes SQLite fall back to a full table scan.
+
+Builds the same statements the routes execute, runs each through
+EXPLAIN QUERY PLAN against an empty schema and checks every plan step.
+Walking a whole index counts as a full scan too, except for paginated
+list queries, which stop at the LIMIT, and reads of everything on
+purpose such as the admin export. Paginated list queries also fail if
+they sort their rows in a temporary B-tree instead of reading them in
+index order up to the LIMIT.
+
+    python scripts/check_query_plans.py
+"""
+import os
+import re
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from sqlalchemy import create_engine, event, select
+from database import Base
+from models.user import User, UserRole
+from models.grievance import Grievance, GrievanceStatus
+from schemas.grievance import GrievanceFilters, GrievanceSort
+from core.outbox import due_recipients_query, outbox_depth_query, purge_dead_query
+from core.pagination import encode_cursor, keyset_page, keyset_union_page
+from routes.grievances import (
+    visible_grievances_query, visible_list_queries, user_grievances_query, notes_query, notes_page_query, search_grievances_query, filter_grievances,
+    stats_query, export_query, list_version_query, grievance_version_query, changes_query, with_list_columns,
+    DEFAULT_PAGE_SIZE, SUMMARY_FIELDS,
+)
+
+# "SCAN grievance" with no index is a full table scan; "SCAN grievance USING
+# INDEX ..." walks an index in order and stops at the LIMIT. Scanning a
+# subquery's or CTE's result ("SCAN anon_1") only reads rows it produced.
+TABLES = "|".join(map(re.escape, Base.metadata.tables))
+FULL_SCAN = re.compile(rf"^SCAN ({TABLES})$")
+# Reads the whole index unless something stops it early
+INDEX_SCAN = re.compile(rf"^SCAN ({TABLES}) USING (COVERING )?INDEX ")
+# A paginated list must read its rows in index order and stop at the LIMIT;
+# sorting them first makes every page cost as much as the whole list
+PAGE_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+def route_queries():
+    user_id = uuid.uuid4()
+    cursor = encode_cursor("created_at", datetime(2024, 1, 1), uuid.uuid4())
+    users = {
+        role: SimpleNamespace(id=user_id, role=role, unit="CSOR")
+        for role in (UserRole.admin, UserRole.supervisor, UserRole.user)
+    }
+
+    # Paginated queries may walk an index, since they stop at the LIMIT;
+    # full_reads may because reading everything is what they are for
+    queries, paginated, full_reads = {}, set(), set()
+
+    def page(name, statement):
+        queries[name] = statement
+        paginated.add(name)
+
+    for role, user in users.items():
+        # A supervisor with grievances outside their unit; one without reads
+        # the unit branch alone
+        branches = visible_list_queries(user)
+        # Summaries join the owner's name into the same query
+        summaries = [with_list_columns(branch, SUMMARY_FIELDS) for branch in branches]
+        page(f"GET /grievances ({role.value}, first page)", keyset_union_page(summaries, Grievance, None, DEFAULT_PAGE_SIZE))
+        page(f"GET /grievances ({role.value}, next page)", keyset_union_page(summaries, Grievance, cursor, DEFAULT_PAGE_SIZE))
+        page(f"GET /grievances?sort=-updated_at ({role.value}, next page)", keyset_union_page(
+            summaries, Grievance, encode_cursor("updated_at", datetime(2024, 1, 1), uuid.uuid4()), DEFAULT_PAGE_SIZE,
+            "updated_at", True
+        ))
+        page(f"GET /grievances ETag ({role.value}, first page)", list_version_query(branches, GrievanceFilters(), True, None, DEFAULT_PAGE_SIZE))
+        queries[f"GET /grievances/export ({role.value})"] = export_query(user, GrievanceFilters())
+        full_reads.add(f"GET /grievances/export ({role.value})")
+        queries[f"GET /grievances/search ({role.value})"] = search_grievances_query(user, '"leave"*').limit(DEFAULT_PAGE_SIZE)
+        queries[f"GET /grievances/changes ({role.value})"] = changes_query(user, datetime(2024, 1, 1), None, DEFAULT_PAGE_SIZE)
+        queries[f"GET /grievances/changes ({role.value}, next page)"] = changes_query(
+            user, datetime(2024, 1, 1), (datetime(2024, 1, 1), uuid.uuid4()), DEFAULT_PAGE_SIZE
+        )
+
+    admin_base = visible_grievances_query(users[UserRole.admin])
+    filtered = {
+        "status": GrievanceFilters(status=[GrievanceStatus.pending]),
+        "type": GrievanceFilters(grievance_type="Harassment", grievance_subtype="Verbal"),
+        "unit": GrievanceFilters(unit="CSOR"),
+        "date range": GrievanceFilters(created_from=datetime(2024, 1, 1), created_to=datetime(2024, 2, 1)),
+        "sort -updated_at": GrievanceFilters(sort=GrievanceSort.updated_at_desc),
+    }
+    for label, filters in filtered.items():
+        query = filter_grievances(admin_base, filters)
+        page(f"GET /grievances?{label} (admin)", keyset_page(
+            query, Grievance, None, DEFAULT_PAGE_SIZE, filters.sort.field, filters.sort.descending
+        ))
+    page("GET /grievances/user/{id} (first page)", keyset_page(user_grievances_query(user_id), Grievance, None, DEFAULT_PAGE_SIZE))
+    page("GET /grievances/user/{id} (next page)", keyset_page(user_grievances_query(user_id), Grievance, cursor, DEFAULT_PAGE_SIZE))
+    queries["GET /grievances/{id}"] = select(Grievance).where(Grievance.id == user_id)
+    queries["GET /grievances/{id} ETag"] = grievance_version_query(user_id)
+    queries["POST /grievances/bulk-status (read back)"] = with_list_columns(select(Grievance), SUMMARY_FIELDS).where(
+        Grievance.id.in_([user_id, uuid.uuid4()])
+    )
+    queries["GET /grievances/{id}/notes?paginate=false"] = notes_query(user_id)
+    page("GET /grievances/{id}/notes (first page)", notes_page_query(user_id, None, DEFAULT_PAGE_SIZE))
+    page("GET /grievances/{id}/notes (next page)", notes_page_query(user_id, cursor, DEFAULT_PAGE_SIZE))
+    # Admins read the whole summary table, which is O(groups) by design
+    queries["GET /grievances/stats (supervisor)"] = stats_query(users[UserRole.supervisor])
+    queries["GET /grievances/stats?month_from (supervisor)"] = stats_query(users[UserRole.supervisor], None, "2024-01")
+    queries["outbox worker: due recipients"] = due_recipients_query(datetime(2024, 1, 1), 100)
+    queries["outbox worker: depth and lag"] = outbox_depth_query()
+    queries["outbox worker: purge dead rows"] = purge_dead_query(datetime(2024, 1, 1))
+    queries["note author lookup (UserLoader)"] = select(User.id, User.name, User.email).where(User.id.in_([user_id, uuid.uuid4()]))
+    return queries, paginated, full_reads
+
+def explain(engine, statement):
+    plans = []
+
+    def capture(conn, cursor, sql, parameters, context, executemany):
+        plans.extend(row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall())
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with engine.connect() as conn:
+            conn.execute(statement)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return plans
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    queries, paginated, full_reads = route_queries()
+    failures = 0
+    for name, statement in queries.items():
+        plan = explain(engine, statement)
+        bad = [
+            step for step in plan
+            if FULL_SCAN.match(step)
+            or (INDEX_SCAN.match(step) and name not in paginated | full_reads)
+            or (name in paginated and step == PAGE_SORT)
+        ]
+        print(f"{'FAIL' if bad else 'ok  '} {name}")
+        for step in plan:
+            print(f"       {step}")
+        failures += bool(bad)
+
+    if failures:
+        print(f"\n{failures} route queries fall back to a full table or index scan, or sort a whole list to serve one page")
+        return 1
+    print("\nAll route queries use an index, and every page is read in index order")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Bulk-import grievances from a CSV or NDJSON file.
+
+Streams the file in chunks and inserts in batches, exactly like
+POST /grievances/import, without going through HTTP. Imported grievances
+are owned by the user given with --owner.
+
+    python scripts/import_grievances.py grievances.csv --owner admin@jsis.com
+    python scripts/import_grievances.py history.ndjson --owner admin@jsis.com --batch-size 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from database import async_session_maker, create_db_and_tables
+from models.user import User
+from models import activity, search, stats  # noqa: F401  (index, summary and activity triggers must exist before inserting)
+from core.importer import IMPORT_BATCH_SIZE, ImportFormat, import_grievances, iter_records
+
+CHUNK_SIZE = 64 * 1024
+
+async def read_chunks(path: str):
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+async def main(args) -> int:
+    fmt = ImportFormat(args.format) if args.format else (
+        ImportFormat.ndjson if args.path.endswith((".ndjson", ".jsonl")) else ImportFormat.csv
+    )
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        owner_id = (await session.execute(select(User.id).where(User.email == args.owner))).scalar_one_or_none()
+        if owner_id is None:
+            print(f"No user with email {args.owner}")
+            return 2
+        result = await import_grievances(session, iter_records(read_chunks(args.path), fmt), owner_id, args.batch_size)
+
+    for error in result.errors:
+        print(f"line {error.line}: {error.error}")
+    if result.errors_truncated:
+        print(f"... {result.failed - len(result.errors)} more errors not shown")
+    print(f"Inserted {result.inserted}, failed {result.failed}")
+    return 1 if result.failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--owner", required=True, help="Email of the user the grievances are filed under")
+    parser.add_argument("--format", choices=[f.value for f in ImportFormat], help="Defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    sys.exit(asyncio.run(main(parser.parse_args())))
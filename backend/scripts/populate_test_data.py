@@ -1,29 +1,40 @@
+"""Generate deterministic test data at any scale.
+
+Writes supervisors, users, grievances and notes to the database the app
+uses (DATABASE_URL) with bulk inserts in large transactions. The same seed
+and sizes always produce the same rows, so a performance run can be
+reproduced exactly.
+
+    python scripts/populate_test_data.py                          # small demo set
+    python scripts/populate_test_data.py --grievances-per-unit 150000 --users-per-unit 2000 --skew 1.1
+
+With --skew above 0, unit sizes and the number of grievances per user
+follow a Zipf-like distribution (a few busy units and prolific users)
+instead of being uniform. Every unit still gets at least one grievance.
+
+Does nothing if the database already holds data for this seed.
+"""
+import argparse
 import asyncio
 import os
+import random
 import sys
+import time
+import uuid
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datetime import datetime, timedelta
-import random
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session
-from database import Base
-from models.user import User
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert, select
+from database import create_db_and_tables, engine
+from models.user import User, UserRole
 from models.grievance import Grievance, Note, GrievanceStatus
-from src.auth.users import get_user_manager, get_user_db
-from src.database import get_async_session
-
-# Database setup
-DATABASE_URL = "sqlite:///test.db"
-engine = create_engine(DATABASE_URL)
-Base.metadata.create_all(engine)
+from models import activity, search, stats  # noqa: F401  (index, summary and activity triggers must exist before inserting)
 
-# Constants
 UNITS = ["427SOA", "CJIRU", "CSOR", "CSOTC", "HQ", "JTF 2", "SOF MPU"]
 RANKS = ["Pte", "Cpl", "MCpl", "Sgt", "WO", "MWO", "CWO", "Lt", "Capt", "Maj", "LCol", "Col"]
 POSITIONS = ["Operator", "Support Staff", "Medical Staff", "Intelligence Officer", "Communications Specialist", "Logistics Coordinator"]
 
-# Add name lists for more realistic data
 FIRST_NAMES = [
     "James", "William", "John", "Michael", "David", "Robert", "Thomas", "Daniel", "Paul", "Mark",
     "Elizabeth", "Sarah", "Jennifer", "Emily", "Emma", "Olivia", "Sophia", "Isabella", "Mia", "Charlotte",
@@ -44,92 +55,177 @@ GRIEVANCE_TYPES = {
     "Harassment": ["Verbal", "Physical", "Sexual", "Psychological"],
     "Other": ["Administrative", "Pay and Benefits", "Training", "Leave"]
 }
+GRIEVANCE_TYPE_PAIRS = [(t, s) for t, subtypes in GRIEVANCE_TYPES.items() for s in subtypes]
 STATUSES = [GrievanceStatus.pending, GrievanceStatus.in_progress, GrievanceStatus.resolved]
+STATUS_WEIGHTS = [3, 2, 5]
+
+NOTE_TEMPLATES = [
+    "Initial review completed. Scheduling meeting with {name} to discuss details.",
+    "Met with {name} to discuss the {subtype} concern. Follow-up actions identified.",
+    "Progress update: Working with unit leadership to address the {type} issue.",
+    "Documentation received from {name}. Under review by chain of command.",
+    "Consultation with subject matter experts regarding {subtype} concerns.",
+]
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.until = datetime.fromisoformat(args.until)
+        # Hashing is deliberately slow; every generated account shares one hash
+        self.password_hash = PasswordHelper().hash("password")
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def zipf_weights(self, n: int):
+        return [1 / (rank ** self.args.skew) for rank in range(1, n + 1)]
 
-def generate_name():
-    return f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}"
-
-def create_supervisor(session: Session, unit: str) -> User:
-    # Replace spaces with underscores and remove any special characters for the email
-    email_unit = unit.lower().replace(' ', '_').replace('/', '_')
-    name = generate_name()
-    email_name = name.lower().replace(' ', '.')
-    
-    supervisor = User(
-        email=f"{email_name}@forces.gc.ca",
-        hashed_password="$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewKyNiAYMxRHHJ",  # "password"
-        unit=unit,
-        role="supervisor",
-        is_active=True,
-        is_verified=True,
-        is_superuser=False,
-        name=name
-    )
-    session.add(supervisor)
-    session.commit()
-    return supervisor
-
-def create_grievance(session: Session, unit: str, created_days_ago: int) -> Grievance:
-    grievance_type = random.choice(list(GRIEVANCE_TYPES.keys()))
-    grievance_subtype = random.choice(GRIEVANCE_TYPES[grievance_type])
-    submitter_name = generate_name()
-    email_name = submitter_name.lower().replace(' ', '.')
-    
-    grievance = Grievance(
-        submitter_name=submitter_name,
-        service_number=f"A{random.randint(10000, 99999)}",
-        rank=random.choice(RANKS),
-        email=f"{email_name}@forces.gc.ca",
-        phone=f"613-555-{random.randint(1000, 9999)}",
-        unit=unit,
-        position=random.choice(POSITIONS),
-        title=f"{grievance_type} - {grievance_subtype} Issue",
-        grievance_type=grievance_type,
-        grievance_subtype=grievance_subtype,
-        description=f"Test grievance description for {grievance_type} - {grievance_subtype}. Submitted by {submitter_name} regarding issues with {grievance_subtype.lower()}.",
-        redress_sought=f"Requesting review and appropriate action to address {grievance_subtype.lower()} concerns in accordance with unit policies.",
-        status=random.choice(STATUSES),
-        created_at=datetime.utcnow() - timedelta(days=created_days_ago),
-        user_id=session.query(User).filter_by(unit=unit).first().id
-    )
-    session.add(grievance)
-    session.commit()
-    
-    # Add random notes (30% chance per grievance)
-    if random.random() < 0.3:
-        supervisor = session.query(User).filter_by(unit=unit, role="supervisor").first()
-        note_content = random.choice([
-            f"Initial review completed. Scheduling meeting with {submitter_name} to discuss details.",
-            f"Met with {submitter_name} to discuss the {grievance_subtype.lower()} concern. Follow-up actions identified.",
-            f"Progress update: Working with unit leadership to address the {grievance_type.lower()} issue.",
-            f"Documentation received from {submitter_name}. Under review by chain of command.",
-            f"Consultation with subject matter experts regarding {grievance_subtype.lower()} concerns."
-        ])
-        
-        note = Note(
-            content=note_content,
-            grievance_id=grievance.id,
-            user_id=supervisor.id if supervisor else grievance.user_id
+    def unit_sizes(self):
+        """Grievances per unit: on average --grievances-per-unit, spread by --skew."""
+        total = self.args.grievances_per_unit * len(self.args.units)
+        weights = self.zipf_weights(len(self.args.units))
+        scale = total / sum(weights)
+        return {unit: max(1, round(weight * scale)) for unit, weight in zip(self.args.units, weights)}
+
+    def user(self, unit: str, role: UserRole, index: int) -> dict:
+        name = self.name()
+        return dict(
+            id=self.uuid(),
+            email=f"{name.lower().replace(' ', '.')}.{unit.lower().replace(' ', '')}.{index}.s{self.args.seed}@forces.gc.ca",
+            hashed_password=self.password_hash,
+            is_active=True,
+            is_superuser=False,
+            is_verified=True,
+            name=name,
+            service_number=f"A{self.rng.randint(10000, 99999)}",
+            rank=self.rng.choice(RANKS),
+            unit=unit,
+            position=self.rng.choice(POSITIONS),
+            phone=f"613-555-{self.rng.randint(1000, 9999)}",
+            role=role,
+        )
+
+    def grievance(self, unit: str, owner: dict) -> dict:
+        grievance_type, grievance_subtype = self.rng.choice(GRIEVANCE_TYPE_PAIRS)
+        created_at = self.until - timedelta(seconds=self.rng.randint(0, self.args.days * 86400))
+        return dict(
+            id=self.uuid(),
+            submitter_name=owner["name"],
+            service_number=owner["service_number"],
+            rank=owner["rank"],
+            email=owner["email"],
+            phone=owner["phone"],
+            unit=unit,
+            position=owner["position"],
+            title=f"{grievance_type} - {grievance_subtype} Issue",
+            grievance_type=grievance_type,
+            grievance_subtype=grievance_subtype,
+            description=f"Test grievance description for {grievance_type} - {grievance_subtype}. Submitted by {owner['name']} regarding issues with {grievance_subtype.lower()}.",
+            redress_sought=f"Requesting review and appropriate action to address {grievance_subtype.lower()} concerns in accordance with unit policies.",
+            status=self.rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            created_at=created_at,
+            updated_at=created_at,
+            user_id=owner["id"],
         )
-        session.add(note)
-        session.commit()
-    
-    return grievance
-
-def main():
-    with Session(engine) as session:
-        # Create supervisors for each unit
-        for unit in UNITS:
-            create_supervisor(session, unit)
-            print(f"Created supervisor for {unit}")
-            
-            # Create random number of grievances (3-8) for each unit
-            num_grievances = random.randint(3, 8)
-            for i in range(num_grievances):
-                created_days_ago = random.randint(1, 365)  # Random date within the last year
-                grievance = create_grievance(session, unit, created_days_ago)
-                print(f"Created grievance {i+1}/{num_grievances} for {unit} from {created_days_ago} days ago")
+
+    def notes(self, grievance: dict, supervisor: dict) -> list:
+        mean = self.args.notes_per_grievance
+        if mean <= 0:
+            return []
+        # Exponential counts: most grievances have a few notes, some have many
+        count = min(int(self.rng.expovariate(1 / mean) + 0.5), self.args.max_notes)
+        notes = []
+        created_at = grievance["created_at"]
+        for _ in range(count):
+            created_at += timedelta(seconds=self.rng.randint(60, 14 * 86400))
+            author = supervisor if self.rng.random() < 0.7 else None
+            notes.append(dict(
+                id=self.uuid(),
+                content=self.rng.choice(NOTE_TEMPLATES).format(
+                    name=grievance["submitter_name"],
+                    type=grievance["grievance_type"].lower(),
+                    subtype=grievance["grievance_subtype"].lower(),
+                ),
+                created_at=created_at,
+                grievance_id=grievance["id"],
+                user_id=author["id"] if author else grievance["user_id"],
+            ))
+        if notes:
+            grievance["updated_at"] = notes[-1]["created_at"]
+        return notes
+
+async def insert_rows(conn, table, rows, batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        await conn.execute(insert(table), rows[start:start + batch_size])
+
+async def populate(args):
+    gen = Generator(args)
+    await create_db_and_tables()
+
+    # Users are generated first so that a rerun can tell whether this seed is already loaded
+    users_by_unit = {}
+    for unit in args.units:
+        supervisor = gen.user(unit, UserRole.supervisor, 0)
+        members = [gen.user(unit, UserRole.user, i) for i in range(1, args.users_per_unit + 1)]
+        users_by_unit[unit] = (supervisor, members)
+
+    first_email = users_by_unit[args.units[0]][0]["email"]
+    async with engine.connect() as conn:
+        if (await conn.execute(select(User.id).where(User.email == first_email))).first():
+            print(f"Database already holds test data for seed {args.seed}; nothing to do")
+            return
+
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        for supervisor, members in users_by_unit.values():
+            await insert_rows(conn, User.__table__, [supervisor, *members], args.batch_size)
+    user_count = sum(1 + len(members) for _, members in users_by_unit.values())
+    print(f"Created {user_count} users in {len(args.units)} units")
+
+    grievance_total = note_total = 0
+    for unit, size in gen.unit_sizes().items():
+        supervisor, members = users_by_unit[unit]
+        owners = [supervisor, *members]
+        owner_weights = gen.zipf_weights(len(owners))
+        remaining = size
+        while remaining:
+            # One transaction per chunk; only the current chunk is held in memory
+            count = min(remaining, args.transaction_size)
+            grievances, notes = [], []
+            for owner in gen.rng.choices(owners, owner_weights, k=count):
+                grievance = gen.grievance(unit, owner)
+                notes.extend(gen.notes(grievance, supervisor))
+                grievances.append(grievance)
+            async with engine.begin() as conn:
+                await insert_rows(conn, Grievance.__table__, grievances, args.batch_size)
+                await insert_rows(conn, Note.__table__, notes, args.batch_size)
+            remaining -= count
+            grievance_total += count
+            note_total += len(notes)
+            elapsed = time.perf_counter() - started
+            print(f"{unit}: {size - remaining}/{size} grievances ({grievance_total / elapsed:,.0f} grievances/s overall)")
+
+    elapsed = time.perf_counter() - started
+    print(f"Created {grievance_total} grievances and {note_total} notes in {elapsed:.1f}s")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--units", nargs="+", default=UNITS)
+    parser.add_argument("--users-per-unit", type=int, default=5, help="Regular users per unit, besides its supervisor")
+    parser.add_argument("--grievances-per-unit", type=int, default=8, help="Average across units")
+    parser.add_argument("--notes-per-grievance", type=float, default=0.5, help="Average; 0 for none")
+    parser.add_argument("--max-notes", type=int, default=200, help="Cap on notes for any one grievance")
+    parser.add_argument("--skew", type=float, default=0.0, help="Zipf exponent for unit sizes and user activity; 0 is uniform")
+    parser.add_argument("--days", type=int, default=365, help="Spread created_at over this many days")
+    parser.add_argument("--until", default="2025-01-01T00:00:00", help="Latest created_at (UTC); fixed so output is reproducible")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per executemany")
+    parser.add_argument("--transaction-size", type=int, default=100_000, help="Grievances per transaction")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    main()
-    print("Test data population complete!") 
\ No newline at end of file
+    asyncio.run(populate(parse_args()))
@@ -0,0 +1,24 @@
+"""Rebuild the grievance full-text index from the grievance table.
+
+Needed once for databases that predate search if the app has not started
+against them yet, and after any VACUUM (which may renumber rowids).
+
+    python scripts/rebuild_search_index.py
+"""
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_and_tables, engine
+from models.user import User  # noqa: F401  (registers the users table)
+from models.search import rebuild_search_index
+
+async def main():
+    await create_db_and_tables()
+    async with engine.begin() as conn:
+        await conn.run_sync(rebuild_search_index)
+    print(f"Rebuilt grievance_fts in {engine.url.render_as_string(hide_password=True)}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
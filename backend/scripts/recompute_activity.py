@@ -0,0 +1,39 @@
+"""Rebuild or verify the grievance list activity columns.
+
+note_count, last_note_at and last_activity_at are kept up to date by
+triggers; rebuild them after restoring a backup or editing notes with the
+triggers disabled. `--check` compares them with the notes table and exits
+non-zero on any mismatch.
+
+    python scripts/recompute_activity.py [--check]
+"""
+import argparse
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_and_tables, engine
+from models.user import User  # noqa: F401  (registers the users table)
+from models.activity import check_activity, recompute_activity
+
+async def main(check: bool) -> int:
+    await create_db_and_tables()
+    async with engine.begin() as conn:
+        if not check:
+            await conn.run_sync(recompute_activity)
+            print(f"Recomputed grievance activity columns in {engine.url.render_as_string(hide_password=True)}")
+            return 0
+        mismatches = await conn.run_sync(check_activity)
+    for grievance_id, stored_count, actual_count, stored_last, actual_last, last_activity in mismatches:
+        print(
+            f"{grievance_id}: note_count stored {stored_count}, actual {actual_count}; "
+            f"last_note_at stored {stored_last}, actual {actual_last}; last_activity_at {last_activity}"
+        )
+    print(f"{len(mismatches)} mismatched grievance(s)")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Only compare against the notes table")
+    sys.exit(asyncio.run(main(parser.parse_args().check)))
@@ -0,0 +1,35 @@
+"""Rebuild or verify the grievance_stats summary table.
+
+The table is kept up to date by triggers; rebuild it after restoring a
+backup or editing grievance rows with the triggers disabled. `--check`
+compares it with a live GROUP BY and exits non-zero on any mismatch.
+
+    python scripts/recompute_stats.py [--check]
+"""
+import argparse
+import asyncio
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import create_db_and_tables, engine
+from models.user import User  # noqa: F401  (registers the users table)
+from models.stats import check_stats, recompute_stats
+
+async def main(check: bool) -> int:
+    await create_db_and_tables()
+    async with engine.begin() as conn:
+        if not check:
+            await conn.run_sync(recompute_stats)
+            print(f"Recomputed grievance_stats in {engine.url.render_as_string(hide_password=True)}")
+            return 0
+        mismatches = await conn.run_sync(check_stats)
+    for unit, status, grievance_type, month, stored, actual in mismatches:
+        print(f"{unit} / {status} / {grievance_type} / {month}: stored {stored}, actual {actual}")
+    print(f"{len(mismatches)} mismatched group(s)")
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Only compare against a live GROUP BY")
+    sys.exit(asyncio.run(main(parser.parse_args().check)))
@@ -0,0 +1,103 @@
+"""Local SMTP stand-in that accepts mail and prints it instead of delivering it.
+
+Point the app at it to watch notification digests go out:
+
+    python scripts/smtp_sink.py --port 1025 [--fail-first N]
+    SMTP_HOST=127.0.0.1 SMTP_PORT=1025 uvicorn app:app
+
+`--fail-first N` answers the first N recipients with a temporary failure
+(451) so the outbox worker's retries can be seen. Only the handful of
+commands smtplib needs are understood; there is no TLS or AUTH.
+"""
+import argparse
+import asyncio
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import List, Optional
+
+class SmtpSink:
+    """Keeps every message it accepts in `messages`."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, fail_first: int = 0, echo: bool = False):
+        self.host = host
+        self.port = port
+        self.fail_first = fail_first
+        self.echo = echo
+        self.messages: List[EmailMessage] = []
+        self.refused = 0
+        self.server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        def reply(*lines: str) -> None:
+            for line in lines[:-1]:
+                writer.write(f"{line[:3]}-{line[4:]}\r\n".encode())
+            writer.write(f"{lines[-1]}\r\n".encode())
+
+        reply("220 smtp-sink ready")
+        recipients: List[str] = []
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="replace").strip()
+                verb = command[:4].upper()
+                if verb == "EHLO":
+                    reply("250 smtp-sink", "250 8BITMIME", "250 SMTPUTF8")
+                elif verb == "HELO":
+                    reply("250 smtp-sink")
+                elif verb == "MAIL":
+                    recipients = []
+                    reply("250 OK")
+                elif verb == "RCPT":
+                    if self.fail_first > 0:
+                        self.fail_first -= 1
+                        self.refused += 1
+                        reply("451 4.3.0 Try again later")
+                    else:
+                        recipients.append(command.partition(":")[2].strip().strip("<>"))
+                        reply("250 OK")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = bytearray()
+                    while (chunk := await reader.readline()) not in (b".\r\n", b""):
+                        # Undo dot-stuffing
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    message = message_from_bytes(bytes(data), policy=policy.default)
+                    self.messages.append(message)
+                    if self.echo:
+                        print(f"--- to {', '.join(recipients)}\n{message.as_string()}", flush=True)
+                    reply("250 OK")
+                elif verb in ("RSET", "NOOP"):
+                    reply("250 OK")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        finally:
+            writer.close()
+
+async def main(host: str, port: int, fail_first: int) -> None:
+    sink = SmtpSink(host, port, fail_first, echo=True)
+    await sink.start()
+    print(f"SMTP sink listening on {sink.host}:{sink.port}", flush=True)
+    await sink.server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--fail-first", type=int, default=0, help="Refuse this many recipients with 451 first")
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.host, args.port, args.fail_first))
+    except KeyboardInterrupt:
+        pass
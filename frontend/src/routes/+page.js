@@ -9,7 +9,7 @@ export const load = async () => {
 			store.setLoading(true);
 			const [stakeholdersData, grievancesData, userData] = await Promise.all([
 				get("/users/all"),
-				get("/grievances"),
+				get("/grievances?paginate=false"),
 				get("/users/me")
 			]);
 			store.setStakeholders(stakeholdersData);
@@ -18,7 +18,7 @@ export const load = async ({ parent }) => {
 
     try {
         personalGrievances.setLoading(true);
-        const grievances = await get(`/grievances/user/${auth.user.id}`);
+        const grievances = await get(`/grievances/user/${auth.user.id}?paginate=false`);
         personalGrievances.setGrievances(grievances);
         return { grievances };
     } catch (error) {
@@ -18,7 +18,7 @@ export const load = async ({ parent }) => {
 
     try {
         store.setLoading(true);
-        const grievances = await get('/grievances');
+        const grievances = await get('/grievances?paginate=false');
         store.setGrievances(grievances);
         return { grievances };
     } catch (error) {